@@ -60,7 +60,8 @@ CREATE TABLE `events` (
   `Country` varchar(100) DEFAULT NULL,
   `Type_of_Event` varchar(100) DEFAULT NULL,
   `Outcome` varchar(50) DEFAULT NULL,
-  PRIMARY KEY (`event_id`)
+  PRIMARY KEY (`event_id`),
+  KEY `idx_events_date` (`Date`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -74,6 +75,39 @@ INSERT INTO `events` VALUES (1,'PokhranUnknownII Nuclear Tests','1998-05-11','In
 /*!40000 ALTER TABLE `events` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `event_impact_summary`
+--
+
+DROP TABLE IF EXISTS `event_impact_summary`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `event_impact_summary` (
+  `Dimension` varchar(20) NOT NULL,
+  `Group_Value` varchar(100) NOT NULL,
+  `Row_Count` bigint NOT NULL DEFAULT '0',
+  `Change_Count` bigint NOT NULL DEFAULT '0',
+  `Change_Sum` double NOT NULL DEFAULT '0',
+  `Change_Sum_Sq` double NOT NULL DEFAULT '0',
+  PRIMARY KEY (`Dimension`,`Group_Value`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `event_summary_state`
+--
+
+DROP TABLE IF EXISTS `event_summary_state`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `event_summary_state` (
+  `Id` tinyint NOT NULL,
+  `Gold_Date` date DEFAULT NULL,
+  `Event_Id` int DEFAULT NULL,
+  PRIMARY KEY (`Id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `gold`
 --
@@ -82,13 +116,14 @@ DROP TABLE IF EXISTS `gold`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!50503 SET character_set_client = utf8mb4 */;
 CREATE TABLE `gold` (
-  `Date` date DEFAULT NULL,
+  `Date` date NOT NULL,
   `Price` double DEFAULT NULL,
   `Open` double DEFAULT NULL,
   `High` double DEFAULT NULL,
   `Low` double DEFAULT NULL,
   `Change %` double DEFAULT NULL,
-  `Source` text
+  `Source` text,
+  PRIMARY KEY (`Date`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -102,6 +137,45 @@ INSERT INTO `gold` VALUES ('1979-12-27',515.5,515.5,515.5,515.5,0,'Investing.com
 /*!40000 ALTER TABLE `gold` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `gold_features`
+--
+
+DROP TABLE IF EXISTS `gold_features`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `gold_features` (
+  `Date` date NOT NULL,
+  `Price` double DEFAULT NULL,
+  `Change %` double DEFAULT NULL,
+  `Price_Lag1` double DEFAULT NULL,
+  `Price_Lag2` double DEFAULT NULL,
+  `7d_avg_price` double DEFAULT NULL,
+  `7d_avg_change` double DEFAULT NULL,
+  PRIMARY KEY (`Date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `prices`
+--
+
+DROP TABLE IF EXISTS `prices`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `prices` (
+  `Ticker` varchar(20) NOT NULL,
+  `Date` date NOT NULL,
+  `Open` double DEFAULT NULL,
+  `High` double DEFAULT NULL,
+  `Low` double DEFAULT NULL,
+  `Close` double DEFAULT NULL,
+  `Volume` double DEFAULT NULL,
+  `Change %` double DEFAULT NULL,
+  PRIMARY KEY (`Ticker`,`Date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Temporary view structure for view `price_change_by_outcome`
 --
@@ -1,7 +1,30 @@
+import os
+import time
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from backend import generate_prediction  # Import the updated backend function
+from jobs import ForecastJobService
+
+# Measured from the start of each script run to the end of the static section
+run_started = time.perf_counter()
+
+# The backend (pandas, pyarrow, scikit-learn) and the chart layer (matplotlib) are
+# imported on first use rather than here, so the page paints before they load
+@st.cache_resource
+def get_backend():
+    import backend  # Import the updated backend functions
+    return backend
+
+@st.cache_resource
+def load_static_image(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+@st.cache_data(ttl=300)
+def load_event_impact_summary(dimension):
+    return get_backend().fetch_event_impact_summary(dimension)
+
+@st.cache_resource
+def first_paint_times():
+    return []
 
 # Set up page configuration
 st.set_page_config(page_title="Gold Price Prediction Dashboard", page_icon="💰", layout="centered")
@@ -30,10 +53,15 @@ with st.expander("📊 About the Dataset"):
 col1, col2 = st.columns(2)
 
 with col1:
-    st.image("Gold_Price_Trend.png", caption="Global Gold Market Trends over the Years")
+    st.image(load_static_image("Gold_Price_Trend.png"), caption="Global Gold Market Trends over the Years")
 
 with col2:
-    st.image("Types_of_Events.png", caption="Top 10 Event Types Influencing Gold Prices")
+    st.image(load_static_image("Types_of_Events.png"), caption="Top 10 Event Types Influencing Gold Prices")
+
+# Log how long the first script run of this process took to paint the static section
+if not first_paint_times():
+    first_paint_times().append(time.perf_counter() - run_started)
+    print(f"First paint after {first_paint_times()[0]:.3f}s")
 
 # Event Type Encoding dictionary including "No Event"
 event_type_encoding = {
@@ -71,28 +99,120 @@ num_days = st.number_input("Number of days to predict", min_value=1, max_value=3
 # Convert selected event type to encoding
 future_event_type = event_type_encoding[selected_event_type]
 
+# Forecasts run on a shared background pool; identical in-flight requests are coalesced
+def run_forecast(future_event_date, future_event_type, num_days):
+    return get_backend().generate_prediction(future_event_date, future_event_type, num_days)
+
+@st.cache_resource
+def get_forecast_service():
+    return ForecastJobService(run_forecast, max_workers=int(os.getenv("FORECAST_WORKERS", "4")))
+
+forecast_service = get_forecast_service()
+
+# Scenario sweeps go through their own pool so a long sweep never holds up a forecast
+def run_simulation(future_event_date, num_days, method):
+    return get_backend().generate_simulation([future_event_date], num_days, method=method)
+
+@st.cache_resource
+def get_simulation_service():
+    return ForecastJobService(run_simulation, max_workers=int(os.getenv("SIMULATION_WORKERS", "1")))
+
 # Prediction Button and Display
 if st.button("🔍 Predict Gold Prices"):
-    st.write("Generating forecast... please wait.")
-    
-    # Call the backend function and fetch forecasted data and plot
-    forecast_df = generate_prediction(future_event_date, future_event_type, num_days)
-    
+    st.session_state['forecast_job'] = forecast_service.submit(future_event_date, future_event_type, num_days)
+
+forecast_job = st.session_state.get('forecast_job')
+
+if forecast_job is not None and not forecast_job.done():
+    # Only this fragment reruns while polling; a full rerun renders the finished forecast
+    @st.fragment(run_every=0.5)
+    def poll_forecast_job():
+        if forecast_job.done():
+            st.rerun()
+        st.write(f"Generating forecast... please wait ({forecast_job.elapsed():.1f}s).")
+
+    poll_forecast_job()
+
+elif forecast_job is not None and forecast_job.exception() is not None:
+    st.error(f"Forecast failed: {forecast_job.exception()}")
+
+elif forecast_job is not None:
+    forecast_df = forecast_job.result()
+    timings = forecast_job.timings()
+    cache_stats = get_backend().forecast_cache.stats()
+    st.caption(f"Forecast for {forecast_job.key[0]} computed in {timings['run_seconds']:.2f}s "
+               f"(queued {timings['queue_seconds']:.2f}s). "
+               f"Result cache hit rate {cache_stats['hit_rate']:.0%} over "
+               f"{cache_stats['hits'] + cache_stats['disk_hits'] + cache_stats['misses']} lookups.")
+
     st.write("### Forecasted Prices")
     st.write(forecast_df)
     
     # Render the plot
     st.write("### Forecasted Price Trend")
-    plt.figure(figsize=(14, 8))
-    plt.plot(forecast_df.index, forecast_df['Forecasted Price'], label='Forecasted Price', color='blue')
-    plt.xlabel('Date')
-    plt.ylabel('Gold Price')
-    plt.title('Gold Price Forecast')
-    plt.legend()
-    st.pyplot(plt)  # Display the plot using Streamlit
+    from charts import render_forecast_png
+    st.image(render_forecast_png(forecast_df))  # Rendered once per forecast, then served from the chart cache
     
     st.markdown("**Predicted Gold Prices over Time**")
 
+# Monte Carlo bands for every event type on the selected date, simulated in one call
+with st.expander("🎲 Compare Event Types"):
+    st.markdown("""
+        Simulates thousands of forecast paths from the model's historical errors and compares every event type
+        on the selected date: expected price, percentile range and the chance of ending above today's price.
+    """)
+    simulation_method = st.radio("Simulated errors", options=["bootstrap", "gaussian"], horizontal=True)
+    if st.button("🎲 Run Scenario Sweep"):
+        st.session_state['simulation_job'] = get_simulation_service().submit(
+            future_event_date, num_days, simulation_method
+        )
+
+    simulation_job = st.session_state.get('simulation_job')
+
+    if simulation_job is not None and not simulation_job.done():
+        @st.fragment(run_every=0.5)
+        def poll_simulation_job():
+            if simulation_job.done():
+                st.rerun()
+            st.write(f"Simulating scenarios... please wait ({simulation_job.elapsed():.1f}s).")
+
+        poll_simulation_job()
+
+    elif simulation_job is not None and simulation_job.exception() is not None:
+        st.error(f"Scenario sweep failed: {simulation_job.exception()}")
+
+    elif simulation_job is not None:
+        simulation = simulation_job.result()
+        event_names = {code: name for name, code in event_type_encoding.items()}
+        comparison = simulation['comparison'].copy()
+        comparison.insert(0, 'Event Type', comparison['Encoded_Event_Type'].map(event_names))
+        st.caption(f"{simulation['paths']} {simulation['method']} paths x {len(comparison)} scenarios "
+                   f"simulated in {simulation['seconds']:.2f}s.")
+        st.dataframe(comparison.drop(columns=['Encoded_Event_Type']).set_index('Event Type'))
+
+        band_event_type = st.selectbox("Percentile bands for", options=list(event_type_encoding.keys()))
+        from simulation import band_frame
+        scenario = comparison.index[comparison['Encoded_Event_Type'] == event_type_encoding[band_event_type]][0]
+        st.line_chart(band_frame(simulation, scenario))
+
+# Historical event impact, served from the ETL-maintained summary table
+with st.expander("📉 Historical Event Impact"):
+    summary_labels = {
+        "By Event Type": "Type_of_Event",
+        "By Outcome": "Outcome",
+        "Event vs Non-Event Days": "Day_Type",
+    }
+    summary_choice = st.radio("Group price changes", options=list(summary_labels.keys()), horizontal=True)
+    # Loaded on request, so rendering the page never imports the backend or queries MySQL
+    if st.button("📉 Load Summary"):
+        st.session_state['show_event_summary'] = True
+    if st.session_state.get('show_event_summary'):
+        try:
+            st.dataframe(load_event_impact_summary(summary_labels[summary_choice]))
+        except Exception as e:
+            # The rest of the page works without the database
+            st.warning(f"Event impact summary is unavailable: {e}")
+
 # Section on Prediction Methodology within a tab
 st.subheader("Prediction Methodology")
 tab1, tab2 = st.tabs(["🔍 How Predictions Work", "📈 Prediction Steps"])
@@ -1,69 +1,247 @@
 import numpy as np
 import pandas as pd
-import mysql.connector
+import copy
 import os
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
-from sklearn.metrics import mean_squared_error
-from sklearn.model_selection import train_test_split
-import matplotlib.pyplot as plt
-
-# MySQL connection setup
-def create_connection():
-    return mysql.connector.connect(
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        host=os.getenv("MYSQL_HOST"),
-        database='project'
-    )
+import time
+from model_registry import ModelRegistry
+from result_cache import ForecastCache
+from forecast import ForecastEngine
+from backtest import walk_forward_backtest, BACKTEST_MIN_TRAIN
+from online import OnlineLinearModel
+from simulation import simulate_scenarios, scenario_grid
+from snapshot import ArrowSnapshot, GOLD_SCHEMA, EVENTS_SCHEMA
+
+# MySQL connections come from the shared bounded pool (close() hands them back)
+from db import create_connection, get_pool, read_sql_chunked
+# Timing spans, row/byte counts and opt-in profiling (JSON log via INSTRUMENTATION_LOG)
+from instrumentation import span, profiled, traced
+
+# scikit-learn is imported inside the training functions: it is the slowest
+# import here and is only needed when a model has to be (re)fitted
+
+# Train on the last TRAINING_WINDOW_YEARS years of data only (0 keeps the full history)
+TRAINING_WINDOW_YEARS = float(os.getenv("TRAINING_WINDOW_YEARS", "0"))
+
+# First date inside the training window, or None for the full history. The window ends at
+# the latest loaded data (not today) and its start is rounded down to the month, so it only
+# moves once a month and online updates keep working in between
+def training_window_start():
+    if TRAINING_WINDOW_YEARS <= 0:
+        return None
+    latest_date = get_data_watermark()[0]
+    if latest_date is None:
+        return None
+    start = pd.Timestamp(latest_date) - pd.Timedelta(days=round(365.25 * TRAINING_WINDOW_YEARS))
+    return start.replace(day=1).date()
+
+# Append a Date range condition (served by the Date index) to a query
+def date_window_query(query, start_date, connector="WHERE"):
+    if start_date is None:
+        return query, ()
+    return f"{query} {connector} Date >= %s", (start_date,)
 
-# Fetch data from the gold table
-def fetch_gold_data_from_mysql():
-    connection = create_connection()
-    query = "SELECT * FROM gold"
-    gold_df = pd.read_sql(query, connection)
-    connection.close()
+# Fetch the model's gold columns, from start_date onwards if given
+def fetch_gold_data_from_mysql(start_date=None):
+    query, params = date_window_query("SELECT Date, Price, `Change %` FROM gold", start_date)
+    with create_connection() as connection, span("db_fetch", table="gold") as stage:
+        gold_df = read_sql_chunked(connection, query + " ORDER BY Date", params)
+        stage.record_frame(gold_df)
     return gold_df
 
-# Fetch data from the events table
-def fetch_events_data_from_mysql():
-    connection = create_connection()
-    query = "SELECT * FROM events"
-    events_df = pd.read_sql(query, connection)
-    connection.close()
+# Fetch the model's event columns, from start_date onwards if given
+def fetch_events_data_from_mysql(start_date=None):
+    query, params = date_window_query("SELECT event_id, Date, Type_of_Event, Outcome FROM events", start_date)
+    with create_connection() as connection, span("db_fetch", table="events") as stage:
+        events_df = read_sql_chunked(connection, query + " ORDER BY event_id", params)
+        stage.record_frame(events_df)
     return events_df
 
-# Function to determine top 15 event types and encode
-def encode_top_15_event_types(events_df):
-    event_counts = events_df['Type_of_Event'].value_counts()
-    top_15_events = event_counts.nlargest(15).index.tolist()
+# Fetch materialized features (maintained by the ETL) with a range scan on Date
+def fetch_features_from_mysql(start_date=None):
+    query, params = date_window_query(
+        "SELECT Date, Price, `Change %`, Price_Lag1, Price_Lag2, `7d_avg_price`, `7d_avg_change` "
+        "FROM gold_features",
+        start_date,
+    )
+    with create_connection() as connection, span("db_fetch", table="gold_features") as stage:
+        features_df = read_sql_chunked(connection, query + " ORDER BY Date", params)
+        stage.record_frame(features_df)
+    return features_df
 
-    def event_encoder(event_type):
-        if pd.isna(event_type):
-            return -1  # Set -1 for no event (NaN values)
-        elif event_type in top_15_events:
-            return top_15_events.index(event_type)
-        else:
-            return 15  # Encode all other event types as 15
+# Summary dimensions maintained by the ETL in event_impact_summary
+EVENT_SUMMARY_DIMENSIONS = ('Type_of_Event', 'Outcome', 'Day_Type')
+
+# Fetch Change % statistics per event type, outcome or event/non-event day
+def fetch_event_impact_summary(dimension='Type_of_Event'):
+    if dimension not in EVENT_SUMMARY_DIMENSIONS:
+        raise ValueError(f"Unknown summary dimension: {dimension}")
+    query = f"""
+    SELECT Group_Value AS `{dimension}`,
+           Row_Count AS Event_Count,
+           Change_Sum / NULLIF(Change_Count, 0) AS Avg_Price_Change,
+           SQRT(GREATEST(
+               (Change_Sum_Sq - Change_Sum * Change_Sum / NULLIF(Change_Count, 0)) / NULLIF(Change_Count - 1, 0),
+               0)) AS Std_Price_Change
+    FROM event_impact_summary
+    WHERE Dimension = %s AND Row_Count > 0
+    ORDER BY Row_Count DESC
+    """
+    with create_connection() as connection, span("db_fetch", table="event_impact_summary") as stage:
+        summary_df = pd.read_sql(query, connection, params=(dimension,))
+        stage.record_frame(summary_df)
+    return summary_df
+
+# Local Arrow snapshots of the gold and events tables
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshot")
+# A windowed snapshot starts at the window, so each window length gets its own files
+SNAPSHOT_SUFFIX = f"_{TRAINING_WINDOW_YEARS:g}y" if TRAINING_WINDOW_YEARS > 0 else ""
+gold_snapshot = ArrowSnapshot(SNAPSHOT_DIR, 'gold' + SNAPSHOT_SUFFIX, GOLD_SCHEMA, 'Date')
+events_snapshot = ArrowSnapshot(SNAPSHOT_DIR, 'events' + SNAPSHOT_SUFFIX, EVENTS_SCHEMA, 'event_id')
+
+# Append rows past the snapshot watermarks (and inside the training window) using a single connection
+@traced("snapshot_refresh")
+def refresh_snapshots(window_start):
+    latest_gold_date = gold_snapshot.watermark()
+    if latest_gold_date is not None:
+        gold_query, gold_params = "SELECT Date, Price, `Change %` FROM gold WHERE Date > %s", (latest_gold_date,)
+    else:
+        gold_query, gold_params = date_window_query("SELECT Date, Price, `Change %` FROM gold", window_start)
+    events_query, window_params = date_window_query(
+        "SELECT event_id, Date, Type_of_Event, Outcome FROM events WHERE event_id > %s", window_start, "AND"
+    )
+
+    with create_connection() as connection:
+        with span("db_fetch", table="gold") as stage:
+            new_gold = read_sql_chunked(connection, gold_query + " ORDER BY Date", gold_params)
+            stage.record_frame(new_gold)
+
+        with span("db_fetch", table="events") as stage:
+            new_events = read_sql_chunked(
+                connection, events_query + " ORDER BY event_id", (events_snapshot.watermark() or 0,) + window_params
+            )
+            stage.record_frame(new_events)
+
+    gold_snapshot.append(new_gold)
+    events_snapshot.append(new_events)
+
+# Keep the rows of a snapshot frame that are inside the training window
+def inside_window(df, window_start):
+    if window_start is None:
+        return df
+    return df[df['Date'] >= pd.Timestamp(window_start)].reset_index(drop=True)
+
+# Load gold prices from the local snapshot (Date, Price, Change %)
+def load_gold_data(window_start):
+    return inside_window(gold_snapshot.load(), window_start)
 
-    events_df['Encoded_Event_Type'] = events_df['Type_of_Event'].apply(event_encoder)
+# Load events from the local snapshot (event_id, Date, Type_of_Event, Outcome)
+def load_events_data(window_start):
+    return inside_window(events_snapshot.load(), window_start)
+
+# Function to determine the 15 most frequent event types
+def top_15_event_types(events_df):
+    # Count plain values so ties keep first-occurrence order for categorical input too
+    event_counts = events_df['Type_of_Event'].astype(object).value_counts()
+    return event_counts.nlargest(15).index.tolist()
+
+# Rank event types on the full history, even with a training window, so the codes keep
+# matching the event type names the app shows
+def ranked_event_types(events_df, window_start):
+    if window_start is None:
+        return top_15_event_types(events_df)
+    with create_connection() as connection, span("db_fetch", table="events") as stage:
+        event_types = read_sql_chunked(connection, "SELECT Type_of_Event FROM events ORDER BY event_id")
+        stage.record_frame(event_types)
+    return top_15_event_types(event_types)
+
+# Function to encode event types (top 15 by frequency, 15 for the rest, -1 for no event)
+def encode_top_15_event_types(events_df, top_15_events=None):
+    if top_15_events is None:
+        top_15_events = top_15_event_types(events_df)
+
+    # Encode each distinct type once, then index the result with the Categorical codes
+    event_types = pd.Categorical(events_df['Type_of_Event'])
+    rank = {event_type: code for code, event_type in enumerate(top_15_events)}
+    category_codes = [rank.get(event_type, 15) for event_type in event_types.categories]
+    # Missing types have Categorical code -1, which picks the trailing -1 (no event)
+    lookup = np.array(category_codes + [-1], dtype=np.int64)
+    events_df['Encoded_Event_Type'] = lookup[event_types.codes]
     return events_df
 
+# Encoded event types 0-15 that get a per-day count column
+EVENT_TYPE_CODES = np.arange(16)
+
+# Function to summarize each day's events before joining them to the prices
+def aggregate_daily_events(events_df):
+    """
+    Collapses encoded events to one row per Date, so days with several events
+    do not duplicate price rows (and shift the lags and rolling windows).
+    Args:
+        events_df (pd.DataFrame): Events with Date, Encoded_Event_Type and Outcome.
+    Returns:
+        pd.DataFrame: One row per event date with Event_Count, one
+        Event_Count_<code> column per encoded type, one Outcome_<value> count
+        column per outcome, Encoded_Event_Type (the day's event type with the
+        highest overall frequency rank, i.e. the lowest code) and
+        Encoded_Outcome (the day's most common outcome).
+    """
+    # Events without a date cannot be joined to a price row
+    events_df = events_df[events_df['Date'].notna()]
+    day, dates = pd.factorize(events_df['Date'], sort=True)
+    days = len(dates)
+    daily = pd.DataFrame({'Date': dates, 'Event_Count': np.bincount(day, minlength=days)})
+
+    # Per-day type counts with one bincount over (day, code) pairs
+    codes = events_df['Encoded_Event_Type'].to_numpy()
+    typed = codes >= 0
+    type_counts = np.bincount(
+        day[typed] * len(EVENT_TYPE_CODES) + codes[typed], minlength=days * len(EVENT_TYPE_CODES)
+    ).reshape(days, len(EVENT_TYPE_CODES))
+    for code in EVENT_TYPE_CODES:
+        daily[f'Event_Count_{code}'] = type_counts[:, code]
+    daily['Encoded_Event_Type'] = np.where(type_counts.any(axis=1), (type_counts > 0).argmax(axis=1), -1)
+
+    # Outcome mix, with outcomes in sorted order so the encoding is stable
+    outcomes = pd.Categorical(events_df['Outcome'].astype(object))
+    outcome_codes = outcomes.codes
+    known = outcome_codes >= 0
+    outcome_counts = np.bincount(
+        day[known] * len(outcomes.categories) + outcome_codes[known], minlength=days * len(outcomes.categories)
+    ).reshape(days, len(outcomes.categories))
+    for i, outcome in enumerate(outcomes.categories):
+        daily[f'Outcome_{outcome}'] = outcome_counts[:, i]
+    most_common = outcome_counts.argmax(axis=1) if len(outcomes.categories) else np.zeros(days, dtype=np.int64)
+    daily['Encoded_Outcome'] = np.where(outcome_counts.any(axis=1), most_common, -1)
+    return daily
+
+# Function to join the per-day event summary to the price rows and fill event-free days
+def join_daily_events(data, events_df):
+    daily = aggregate_daily_events(events_df)
+    data = pd.merge(data, daily, on='Date', how='left', validate='one_to_one')
+
+    count_columns = [col for col in daily.columns if col not in ('Date', 'Encoded_Event_Type', 'Encoded_Outcome')]
+    data[count_columns] = data[count_columns].fillna(0).astype(int)
+    data['Event_Occurred'] = (data['Event_Count'] > 0).astype(int)
+    data['Encoded_Event_Type'] = data['Encoded_Event_Type'].fillna(-1).astype(int)
+    data['Encoded_Outcome'] = data['Encoded_Outcome'].fillna(-1).astype(int)
+    return data
+
+# Function to drop raw event columns that are not model features
+def drop_event_detail_columns(data):
+    columns_to_drop = ['event_id', 'Type_of_Event', 'Outcome', 'Name_of_Incident', 'Country', 'Source']
+    for col in columns_to_drop:
+        if col in data.columns:
+            data.drop(columns=[col], inplace=True)
+    return data
+
 # Function to perform feature engineering and combine data
-def prepare_features(gold_df, events_df):
+@traced("feature_prep")
+def prepare_features(gold_df, events_df, top_15_events=None):
     gold_df['Date'] = pd.to_datetime(gold_df['Date'])
     events_df['Date'] = pd.to_datetime(events_df['Date'])
     
-    events_df = encode_top_15_event_types(events_df)
-    data = pd.merge(gold_df, events_df, on='Date', how='left')
-    
-    data['Event_Occurred'] = data['event_id'].notnull().astype(int)
-    data['Encoded_Event_Type'] = data['Encoded_Event_Type'].fillna(-1).astype(int)
-    data.loc[data['Event_Occurred'] == 0, 'Encoded_Event_Type'] = -1
-
-    le_outcome = LabelEncoder()
-    data['Encoded_Outcome'] = le_outcome.fit_transform(data['Outcome'].fillna("No Event"))
-    data.loc[data['Event_Occurred'] == 0, 'Encoded_Outcome'] = -1
+    events_df = encode_top_15_event_types(events_df, top_15_events)
+    data = join_daily_events(gold_df, events_df)
 
     data['Price_Lag1'] = data['Price'].shift(1)
     data['Price_Lag2'] = data['Price'].shift(2)
@@ -76,25 +254,96 @@ def prepare_features(gold_df, events_df):
         data['7d_avg_price'] = data['Price'].rolling(window=7).mean()
         data['7d_avg_change'] = data['Change %'].rolling(window=7).mean()
 
+    data = drop_event_detail_columns(data)
     data.fillna(0, inplace=True)
-    
-    columns_to_drop = ['event_id', 'Type_of_Event', 'Outcome', 'Name_of_Incident', 'Country', 'Source']
-    for col in columns_to_drop:
-        if col in data.columns:
-            data.drop(columns=[col], inplace=True)
-    
     return data
 
-# Full workflow function for training and prediction
-def generate_prediction(future_event_date, future_event_type, num_days):
-    # Step 1: Fetch data from MySQL
-    gold_df = fetch_gold_data_from_mysql()
-    events_df = fetch_events_data_from_mysql()
-    
-    # Step 2: Prepare features
-    training_data = prepare_features(gold_df, events_df)
+# Function to combine materialized price features with the current event encoding
+@traced("feature_prep")
+def prepare_features_from_store(features_df, events_df, top_15_events=None):
+    features_df['Date'] = pd.to_datetime(features_df['Date'])
+    events_df['Date'] = pd.to_datetime(events_df['Date'])
+
+    # Event codes depend on the global top-15 ranking, so they are joined at read time
+    events_df = encode_top_15_event_types(events_df, top_15_events)
+    data = join_daily_events(features_df, events_df)
+
+    data = drop_event_detail_columns(data)
+    data.fillna(0, inplace=True)
+    return data
+
+# Share of the most recent rows held out to measure RMSE (and to seed the forecast history)
+TEST_FRACTION = 0.02
+
+# Most recent one-step training residuals kept with the model for Monte Carlo bands
+RESIDUAL_POOL_ROWS = int(os.getenv("RESIDUAL_POOL_ROWS", "2500"))
+
+# Run the walk-forward backtest after every retrain (BACKTEST_* settings in backtest.py)
+BACKTEST_ON_RETRAIN = os.getenv("BACKTEST_ON_RETRAIN", "1") != "0"
+
+# Update the previous model with rows loaded since it was fitted instead of refitting everything
+ONLINE_LEARNING = os.getenv("ONLINE_LEARNING", "1") != "0"
+
+# Fetch the data watermark (latest feature date, latest event_id) used to version trained models.
+# Training reads gold_features, which the ETL fills after the gold load, so the date comes from
+# there; gold is only used until the feature store has been built
+def get_data_watermark():
+    result = get_pool().fetch_one_prepared(
+        "SELECT COALESCE((SELECT MAX(Date) FROM gold_features), (SELECT MAX(Date) FROM gold)), "
+        "(SELECT MAX(event_id) FROM events)"
+    )
+    return (result[0], result[1]) if result else (None, None)
+
+# Train the encoder, scaler and regression model on the full history
+def train_model():
+    # Step 1: Bring the local snapshots up to date and load the data
+    window_start = training_window_start()
+    refresh_snapshots(window_start)
+    events_df = load_events_data(window_start)
+    features_df = fetch_features_from_mysql(start_date=window_start)
+    top_15_events = ranked_event_types(events_df, window_start)
+
+    # Step 2: Prepare features (full recomputation until the ETL has built the feature store)
+    if not features_df.empty:
+        training_data = prepare_features_from_store(features_df, events_df, top_15_events)
+    else:
+        gold_df = load_gold_data(window_start)
+        training_data = prepare_features(gold_df, events_df, top_15_events)
 
     # Step 3: Train model
+    trained = fit_model(training_data)
+
+    # Sufficient statistics of the same fit, so later data can be absorbed incrementally
+    if ONLINE_LEARNING and not features_df.empty:
+        event_id = int(events_df['event_id'].max()) if not events_df.empty else 0
+        trained['online'] = start_online_state(training_data, top_15_events, event_id, window_start)
+
+    # Walk-forward error by horizon and event type, kept with the model it describes
+    # It is a diagnostic: short histories skip it and a failure never aborts training
+    if BACKTEST_ON_RETRAIN and len(training_data) <= BACKTEST_MIN_TRAIN:
+        print(f"Skipping the backtest: {len(training_data)} rows, it needs more than {BACKTEST_MIN_TRAIN}.")
+    elif BACKTEST_ON_RETRAIN:
+        try:
+            with span("backtest") as stage:
+                backtest = walk_forward_backtest(training_data)
+                stage.record(rows=backtest['folds'])
+        except Exception as e:
+            print(f"Backtest failed, keeping the model without it: {e}")
+        else:
+            trained['backtest'] = backtest
+            by_horizon = backtest['by_horizon']['RMSE']
+            print(f"Backtest over {backtest['folds']} origins: RMSE {by_horizon.iloc[0]:.2f} at 1 day, "
+                  f"{by_horizon.iloc[-1]:.2f} at {backtest['horizon']} days ({backtest['seconds']:.2f}s).")
+    return trained
+
+# Fit the encoder, scaler and regressor on prepared features and build the forecast engine
+@traced("fit")
+def fit_model(training_data):
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+    from sklearn.metrics import mean_squared_error
+    from sklearn.model_selection import train_test_split
+
     data = training_data.copy()
     data['Date'] = pd.to_datetime(data['Date'])
     data.set_index('Date', inplace=True)
@@ -109,7 +358,7 @@ def generate_prediction(future_event_date, future_event_type, num_days):
     )
     data = pd.concat([data[['Price', "Price_Lag1"]], encoded_event_df], axis=1)
 
-    train_data, test_data = train_test_split(data, test_size=0.02, shuffle=False)
+    train_data, test_data = train_test_split(data, test_size=TEST_FRACTION, shuffle=False)
     X_train = train_data.drop(columns='Price')
     y_train = train_data['Price']
     X_test = test_data.drop(columns='Price')
@@ -121,50 +370,209 @@ def generate_prediction(future_event_date, future_event_type, num_days):
 
     model = LinearRegression()
     model.fit(X_train_scaled, y_train)
+    # The first row has no real lag (filled with 0), so its residual is left out
+    residuals = (y_train.to_numpy() - model.predict(X_train_scaled))[1:][-RESIDUAL_POOL_ROWS:]
     predictions = model.predict(X_test_scaled)
     rmse = np.sqrt(mean_squared_error(y_test, predictions))
     print(f"Linear Regression RMSE: {rmse:.2f}")
 
-    # Step 4: Predict future prices
-    last_test_date = test_data.index[-1]
-    start_date = last_test_date + pd.Timedelta(days=1)
-    end_date = pd.to_datetime(future_event_date) + pd.Timedelta(days=num_days)
-    all_dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    # Only the tail of the test set is needed for forecasting and plotting
+    trained = {
+        'encoder': encoder,
+        'scaler': scaler,
+        'model': model,
+        'event_columns': event_columns,
+        'feature_columns': X_train.columns.tolist(),
+        'history': test_data['Price'].iloc[-100:].copy(),
+        'rmse': rmse,
+        'residuals': residuals,
+    }
+    trained['engine'] = ForecastEngine(trained)
+    return trained
 
-    last_known_price = test_data['Price'].iloc[-1]
-    prev_price = last_known_price
-    future_prices = []
+# Rows held out by train_test_split(test_size=TEST_FRACTION) for n rows
+def test_row_count(n):
+    return int(np.ceil(TEST_FRACTION * n))
 
-    for date in all_dates:
-        features = {col: 0 for col in X_train.columns}
-        if date == pd.to_datetime(future_event_date):
-            event_type_value = [[future_event_type]]
-        else:
-            event_type_value = [[-1]]
-
-        encoded_event = encoder.transform(event_type_value)
-        for idx, col in enumerate(encoder.get_feature_names_out(event_columns)):
-            features[col] = encoded_event[0][idx]
-
-        features['Price_Lag1'] = prev_price
-        features_df = pd.DataFrame([features], index=[date])
-        features_df = features_df[X_train.columns]
-        
-        features_scaled = scaler.transform(features_df)
-        predicted_price = model.predict(features_scaled)[0]
-        future_prices.append(predicted_price)
-        prev_price = predicted_price
-
-    forecast_df = pd.DataFrame({'Date': all_dates, 'Forecasted Price': future_prices})
-    forecast_df.set_index('Date', inplace=True)
-
-    plt.figure(figsize=(14, 8))
-    plt.plot(test_data.index[-100:], test_data['Price'][-100:], label='Historical Price', color='black')
-    plt.plot(forecast_df.index, forecast_df['Forecasted Price'], label='Forecasted Price', color='blue')
-    plt.xlabel('Date')
-    plt.ylabel('Gold Price')
-    plt.title('Gold Price Forecast')
-    plt.legend()
-    plt.show()
-
-    return forecast_df
+# Columns the online model needs from the most recent training rows
+ONLINE_COLUMNS = ['Price', 'Price_Lag1', 'Encoded_Event_Type']
+
+# Online state matching a full fit of training_data
+def start_online_state(training_data, top_15_events, event_id, window_start=None):
+    n = len(training_data)
+    n_train = n - test_row_count(n)
+    model = OnlineLinearModel()
+    model.update(training_data.iloc[:n_train])
+    # Training data has one row per date, so the untrained tail starts at a date
+    return {
+        'model': model, 'top_15': top_15_events, 'event_id': event_id, 'window_start': window_start,
+        'train_rows': n_train, 'tail_date': pd.to_datetime(training_data['Date']).iloc[n_train],
+        'recent_rows': training_data[ONLINE_COLUMNS].iloc[1:n_train].tail(RESIDUAL_POOL_ROWS),
+    }
+
+# Model bundle (same keys as fit_model minus the sklearn objects) from online statistics
+def online_bundle(model, test_data, recent_rows):
+    weights, intercept = model.solve()
+    predictions = model.predict(test_data)
+    rmse = float(np.sqrt(np.mean((test_data['Price'].to_numpy() - predictions) ** 2)))
+    print(f"Linear Regression RMSE: {rmse:.2f}")
+
+    history = test_data.set_index(pd.to_datetime(test_data['Date']))['Price'].iloc[-100:].copy()
+    trained = {
+        'event_columns': ['Encoded_Event_Type'],
+        'feature_columns': ['Price_Lag1'] + [f"Encoded_Event_Type_{code}" for code in model.categories],
+        'history': history,
+        'rmse': rmse,
+        'residuals': recent_rows['Price'].to_numpy() - model.predict(recent_rows),
+    }
+    trained['engine'] = ForecastEngine.from_weights(weights[0], model.event_effects(), intercept, history)
+    return trained
+
+@traced("online_update")
+def update_model(trained):
+    """
+    Absorbs the rows loaded since `trained` was fitted into its sufficient
+    statistics and re-solves, reading only features from the first untrained
+    date onwards. Returns None when a full refit is required: no online state,
+    a changed top-15 event ranking (every event code changes), new events
+    dated before the untrained tail (already-trained rows change), or a moved
+    training window (rows have to leave the statistics; the refit only reads
+    the window). The window start only moves once a month.
+    """
+    state = trained.get('online')
+    if not ONLINE_LEARNING or state is None:
+        return None
+    window_start = training_window_start()
+    if window_start != state.get('window_start'):
+        print("Training window moved to the next month; refitting the model from scratch.")
+        return None
+
+    refresh_snapshots(window_start)
+    events_df = load_events_data(window_start)
+    top_15_events = ranked_event_types(events_df, window_start)
+    if top_15_events != state['top_15']:
+        print("Top-15 event types changed; refitting the model from scratch.")
+        return None
+
+    tail_date = state['tail_date']
+    event_dates = pd.to_datetime(events_df['Date'])
+    if ((events_df['event_id'] > state['event_id']) & (event_dates < tail_date)).any():
+        print("New events on already-trained dates; refitting the model from scratch.")
+        return None
+
+    features_df = fetch_features_from_mysql(start_date=tail_date.date())
+    if features_df.empty:
+        return None
+    tail = prepare_features_from_store(features_df, events_df[event_dates >= tail_date].copy(), top_15_events)
+    tail = tail.reset_index(drop=True)
+
+    # Row numbers in the full history: the tail starts at row train_rows
+    first = state['train_rows']
+    n = first + len(tail)
+    n_train = n - test_row_count(n)
+
+    # Update a copy: the current bundle keeps serving forecasts meanwhile
+    model = copy.deepcopy(state['model'])
+    new_rows = tail.iloc[:n_train - first]
+    model.update(new_rows)
+    print(f"Online update: absorbed {len(new_rows)} new training rows.")
+
+    recent_rows = pd.concat([state['recent_rows'], new_rows[ONLINE_COLUMNS]]).tail(RESIDUAL_POOL_ROWS)
+    updated = online_bundle(model, tail.iloc[n_train - first:], recent_rows)
+    updated['online'] = dict(
+        state, model=model, train_rows=n_train, tail_date=tail['Date'].iloc[n_train - first],
+        recent_rows=recent_rows,
+        event_id=int(events_df['event_id'].max()) if not events_df.empty else 0,
+    )
+    # The walk-forward backtest covers the full history; it is refreshed on the next full refit
+    if 'backtest' in trained:
+        updated['backtest'] = trained['backtest']
+    return updated
+
+# Trained models are cached in memory and on disk until the ETL adds new rows
+# Settings that change the trained model: persisted models and cached forecasts are kept per variant
+MODEL_VARIANT = f"window{TRAINING_WINDOW_YEARS:g}y-online{int(ONLINE_LEARNING)}"
+model_registry = ModelRegistry(
+    train_model, get_data_watermark, update_fn=update_model, cache_name=f"model-{MODEL_VARIANT}"
+)
+
+# Bring the snapshots and the model up to date ahead of the first forecast
+def prewarm():
+    timings = {}
+    started = time.perf_counter()
+    refresh_snapshots(training_window_start())
+    timings['snapshot_seconds'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model_registry.get()
+    timings['model_seconds'] = time.perf_counter() - started
+    return timings
+
+# Forecast results per (date, event type, days, data watermark); FORECAST_CACHE_DIR='' keeps it in memory only
+forecast_cache = ForecastCache(
+    max_bytes=int(float(os.getenv("FORECAST_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    ttl=float(os.getenv("FORECAST_CACHE_TTL", "3600")),
+    disk_dir=os.getenv("FORECAST_CACHE_DIR", "forecast_cache") or None,
+    max_disk_bytes=int(float(os.getenv("FORECAST_CACHE_DISK_MB", "256")) * 1024 * 1024),
+    name=f"forecast-{MODEL_VARIANT}",
+)
+
+# ForecastCache reads the watermark from the last key element, so it stays last
+def forecast_cache_key(future_event_date, future_event_type, num_days, watermark):
+    return (
+        str(pd.Timestamp(future_event_date).date()), int(future_event_type), int(num_days), MODEL_VARIANT, watermark
+    )
+
+# Full workflow function for training and prediction
+def generate_prediction(future_event_date, future_event_type, num_days):
+    with profiled("forecast_request", event_type=int(future_event_type), num_days=int(num_days)) as request:
+        entry = model_registry.get_entry()
+        trained = entry['trained']
+
+        # A new watermark means the ETL loaded new rows: results for older data are dropped
+        forecast_cache.set_watermark(entry['watermark'])
+        key = forecast_cache_key(future_event_date, future_event_type, num_days, entry['watermark'])
+        forecast_df = forecast_cache.get(key)
+        if forecast_df is not None:
+            request.record(rows=len(forecast_df), cache_hit=True)
+            return forecast_df.copy()
+
+        # Step 4: Predict future prices
+        with span("forecast") as stage:
+            forecast_df = trained['engine'].forecast(future_event_date, future_event_type, num_days)
+            stage.record(rows=len(forecast_df))
+        forecast_cache.put(key, forecast_df.copy())
+
+        request.record(rows=len(forecast_df), cache_hit=False)
+        return forecast_df
+
+# Forecast many (future_event_date, future_event_type, num_days) scenarios in a single pass
+def generate_predictions(scenarios):
+    trained = model_registry.get()
+    return trained['engine'].forecast_batch(scenarios)
+
+# Monte Carlo percentile bands and an event-type comparison for a grid of scenarios
+def generate_simulation(future_event_dates, num_days, event_types=None, paths=None, method="bootstrap", seed=None):
+    """
+    Args:
+        future_event_dates (list): Event dates to sweep.
+        num_days (int): Days to forecast past each event date.
+        event_types (list, optional): Encoded event types to sweep (all by default).
+        paths (int, optional): Simulated paths (SIMULATION_PATHS by default).
+        method (str): "bootstrap" or "gaussian" residuals.
+        seed (int, optional): Random seed.
+    Returns:
+        dict: See simulation.simulate_scenarios.
+    """
+    if event_types is None:
+        event_types = range(-1, 16)
+    scenarios = scenario_grid(future_event_dates, event_types, num_days)
+    with profiled("simulation_request", scenarios=len(scenarios), method=method) as request:
+        trained = model_registry.get()
+        # Models cached before residuals were stored: shocks of +-RMSE have the same spread
+        residuals = trained.get('residuals')
+        if residuals is None:
+            residuals = np.array([-trained['rmse'], trained['rmse']])
+        result = simulate_scenarios(trained['engine'], residuals, scenarios, paths=paths, method=method, seed=seed)
+        request.record(rows=len(scenarios), paths=result['paths'])
+        return result
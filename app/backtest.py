@@ -0,0 +1,255 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Walk-forward settings: forecast horizon (rows), spacing between origins, smallest training prefix
+BACKTEST_HORIZON = int(os.getenv("BACKTEST_HORIZON", "30"))
+BACKTEST_STEP = int(os.getenv("BACKTEST_STEP", "5"))
+BACKTEST_MIN_TRAIN = int(os.getenv("BACKTEST_MIN_TRAIN", "250"))
+# Processes evaluating folds; 1 evaluates them in-process
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "1"))
+
+# Ridge added to the standardized normal equations (far below any real signal)
+SOLVE_RIDGE = 1e-12
+
+
+def design_matrix(training_data, event_column='Encoded_Event_Type'):
+    """
+    Builds the regression inputs of backend.fit_model: Price_Lag1 followed by
+    one one-hot column per event code.
+    Args:
+        training_data (pd.DataFrame): Output of prepare_features, ordered by Date.
+        event_column (str): Encoded event type column.
+    Returns:
+        tuple: (X, y, codes, categories) as NumPy arrays.
+    """
+    codes = training_data[event_column].to_numpy(dtype=np.int64)
+    categories = np.unique(codes)
+    onehot = (codes[:, None] == categories[None, :]).astype(np.float64)
+    X = np.column_stack([training_data['Price_Lag1'].to_numpy(dtype=np.float64), onehot])
+    y = training_data['Price'].to_numpy(dtype=np.float64)
+    return X, y, codes, categories
+
+
+def solve_normal_equations(count, sum_x, sum_xx, sum_y, sum_xy):
+    """
+    Least-squares weights and intercept from sufficient statistics.
+
+    The moments are centred and standardized before solving, as
+    StandardScaler + LinearRegression would, and the minimum-norm solution is
+    taken so collinear one-hot columns and event codes absent from the
+    training rows get no weight (like OneHotEncoder(handle_unknown='ignore')).
+    All arguments may carry a leading batch dimension to solve many fits at once.
+    Args:
+        count (int or np.ndarray): Number of rows.
+        sum_x (np.ndarray): Column sums of X.
+        sum_xx (np.ndarray): X^T X.
+        sum_y (float or np.ndarray): Sum of y.
+        sum_xy (np.ndarray): X^T y.
+    Returns:
+        tuple: (weights, intercept)
+    """
+    count = np.asarray(count, dtype=np.float64)[..., None]
+    mean_x = sum_x / count
+    mean_y = np.asarray(sum_y)[..., None] / count
+    cov = sum_xx / count[..., None] - mean_x[..., :, None] * mean_x[..., None, :]
+    cov_xy = sum_xy / count - mean_x * mean_y
+    scale = np.sqrt(np.clip(np.diagonal(cov, axis1=-2, axis2=-1), 0, None))
+    scale = np.where(scale > 0, scale, 1.0)
+    corr = cov / (scale[..., :, None] * scale[..., None, :])
+
+    # A vanishing ridge selects the minimum-norm solution: directions with no
+    # variance (the one-hot sum, unseen codes) get no weight, the rest are exact
+    corr = corr + SOLVE_RIDGE * np.eye(corr.shape[-1])
+    weights = np.linalg.solve(corr, (cov_xy / scale)[..., None])[..., 0] / scale
+    intercept = mean_y[..., 0] - np.einsum('...i,...i->...', weights, mean_x)
+    return weights, intercept
+
+
+def evaluate_origins(X, y, origins, horizon):
+    """
+    Refits the model at each forecast origin on all rows before it and runs
+    the recursive multi-step forecast, using the realized event types of the
+    target days.
+
+    Origins must be increasing: the sufficient statistics are carried from
+    one origin to the next, so each refit only adds the rows in between.
+    Args:
+        X (np.ndarray): Design matrix (Price_Lag1 first).
+        y (np.ndarray): Prices.
+        origins (np.ndarray): Index of the first forecast row of each fold.
+        horizon (int): Rows forecast per fold.
+    Returns:
+        np.ndarray: (folds x horizon) forecast errors, NaN past the data.
+    """
+    n, k = X.shape
+    origins = np.asarray(origins)
+
+    # Moments are accumulated around a fixed reference to limit cancellation
+    shift_x = X[:origins[0]].mean(axis=0)
+    shift_y = y[:origins[0]].mean()
+    count = 0
+    sum_x = np.zeros(k)
+    sum_xx = np.zeros((k, k))
+    sum_y = 0.0
+    sum_xy = np.zeros(k)
+
+    # Moments at every origin, then one batched solve for all folds
+    folds = len(origins)
+    counts = np.empty(folds)
+    sums_x = np.empty((folds, k))
+    sums_xx = np.empty((folds, k, k))
+    sums_y = np.empty(folds)
+    sums_xy = np.empty((folds, k))
+    previous = 0
+    for i, origin in enumerate(origins):
+        block = X[previous:origin] - shift_x
+        target = y[previous:origin] - shift_y
+        count += len(block)
+        sum_x += block.sum(axis=0)
+        sum_xx += block.T @ block
+        sum_y += target.sum()
+        sum_xy += block.T @ target
+        previous = origin
+        counts[i], sums_x[i], sums_xx[i], sums_y[i], sums_xy[i] = count, sum_x, sum_xx, sum_y, sum_xy
+
+    weights, intercepts = solve_normal_equations(counts, sums_x, sums_xx, sums_y, sums_xy)
+    intercepts = intercepts + shift_y - weights @ shift_x
+
+    # Recursive forecasts for all folds at once: p[t] = a * p[t-1] + w_event . x_event[t] + b
+    errors = np.full((len(origins), horizon), np.nan)
+    lag = y[origins - 1]
+    for h in range(horizon):
+        rows = origins + h
+        valid = rows < n
+        rows = np.minimum(rows, n - 1)
+        prediction = weights[:, 0] * lag + np.einsum('ij,ij->i', weights[:, 1:], X[rows, 1:]) + intercepts
+        errors[:, h] = np.where(valid, prediction - y[rows], np.nan)
+        lag = prediction
+    return errors
+
+
+def _attach(name):
+    try:
+        # Python 3.13+: the creating process owns cleanup
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _evaluate_shared(x_spec, y_spec, origins, horizon):
+    """Worker entry point: evaluates folds on arrays read from shared memory."""
+    x_shm = _attach(x_spec[0])
+    y_shm = _attach(y_spec[0])
+    try:
+        X = np.ndarray(x_spec[1], dtype=np.float64, buffer=x_shm.buf)
+        y = np.ndarray(y_spec[1], dtype=np.float64, buffer=y_shm.buf)
+        errors = evaluate_origins(X, y, origins, horizon)
+        del X, y
+        return errors
+    finally:
+        x_shm.close()
+        y_shm.close()
+
+
+def _share(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape)
+
+
+def evaluate_parallel(X, y, origins, horizon, workers):
+    """
+    Splits the origins into contiguous chunks evaluated by a process pool.
+    X and y are placed in shared memory once instead of being pickled per task.
+    """
+    chunks = [chunk for chunk in np.array_split(origins, workers) if len(chunk)]
+    x_shm, x_spec = _share(X)
+    y_shm, y_spec = _share(y)
+    try:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            futures = [pool.submit(_evaluate_shared, x_spec, y_spec, chunk, horizon) for chunk in chunks]
+            return np.vstack([future.result() for future in futures])
+    finally:
+        for shm in (x_shm, y_shm):
+            shm.close()
+            shm.unlink()
+
+
+def summarize_errors(errors, codes, origins, horizon):
+    """
+    Returns:
+        tuple: (by_horizon, by_event_type) DataFrames with Count, MAE, RMSE
+        (and Bias per horizon).
+    """
+    valid = ~np.isnan(errors)
+    counts = valid.sum(axis=0)
+    filled = np.where(valid, errors, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        by_horizon = pd.DataFrame({
+            'Horizon': np.arange(1, horizon + 1),
+            'Count': counts,
+            'MAE': np.abs(filled).sum(axis=0) / counts,
+            'RMSE': np.sqrt((filled ** 2).sum(axis=0) / counts),
+            'Bias': filled.sum(axis=0) / counts,
+        }).set_index('Horizon')
+
+    # Errors grouped by the encoded event type of the forecast day
+    rows = (origins[:, None] + np.arange(horizon)[None, :])[valid]
+    target_codes, group = np.unique(codes[rows], return_inverse=True)
+    flat = errors[valid]
+    group_counts = np.bincount(group)
+    by_event_type = pd.DataFrame({
+        'Encoded_Event_Type': target_codes,
+        'Count': group_counts,
+        'MAE': np.bincount(group, weights=np.abs(flat)) / group_counts,
+        'RMSE': np.sqrt(np.bincount(group, weights=flat ** 2) / group_counts),
+    }).set_index('Encoded_Event_Type')
+    return by_horizon, by_event_type
+
+
+def walk_forward_backtest(training_data, horizon=None, step=None, min_train=None, workers=None):
+    """
+    Walk-forward evaluation of the model over rolling origins: at every
+    `step`-th row after `min_train` the model is refit on the expanding
+    history and used to forecast the next `horizon` rows.
+
+    Args:
+        training_data (pd.DataFrame): Output of prepare_features, ordered by Date.
+        horizon (int, optional): Rows forecast per origin.
+        step (int, optional): Rows between consecutive origins.
+        min_train (int, optional): Training rows before the first origin.
+        workers (int, optional): Processes used to evaluate the folds.
+    Returns:
+        dict: by_horizon and by_event_type error tables, fold count and timing.
+    """
+    horizon = horizon or BACKTEST_HORIZON
+    step = step or BACKTEST_STEP
+    min_train = min_train or BACKTEST_MIN_TRAIN
+    workers = workers or BACKTEST_WORKERS
+
+    started = time.perf_counter()
+    X, y, codes, _ = design_matrix(training_data)
+    origins = np.arange(max(min_train, 2), len(y), step)
+    if len(origins) == 0:
+        raise ValueError(f"Backtest needs more than {min_train} rows, got {len(y)}")
+
+    if workers > 1 and len(origins) >= 2 * workers:
+        errors = evaluate_parallel(X, y, origins, horizon, workers)
+    else:
+        errors = evaluate_origins(X, y, origins, horizon)
+
+    by_horizon, by_event_type = summarize_errors(errors, codes, origins, horizon)
+    return {
+        'by_horizon': by_horizon,
+        'by_event_type': by_event_type,
+        'folds': len(origins),
+        'horizon': horizon,
+        'step': step,
+        'seconds': time.perf_counter() - started,
+    }
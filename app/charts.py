@@ -0,0 +1,75 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+
+# Rendered forecast charts kept per forecast key
+CHART_CACHE_ENTRIES = 64
+
+_charts = OrderedDict()
+_charts_lock = threading.Lock()
+
+
+def forecast_chart_key(forecast_df):
+    """
+    Returns a key identifying the forecast's contents, so a chart is reused
+    for the same scenario and rebuilt once new data changes the forecast.
+    """
+    return hashlib.sha1(pd.util.hash_pandas_object(forecast_df).values.tobytes()).hexdigest()
+
+
+def forecast_figure(forecast_df, history=None):
+    """
+    Builds the forecast chart with the object-oriented Figure API, which keeps
+    no global pyplot state and is therefore safe across concurrent sessions.
+
+    Args:
+        forecast_df (pd.DataFrame): Forecast indexed by Date with 'Forecasted Price'.
+        history (pd.Series, optional): Historical prices drawn before the forecast.
+    Returns:
+        Figure: The chart.
+    """
+    fig = Figure(figsize=(14, 8))
+    ax = fig.subplots()
+    if history is not None:
+        ax.plot(history.index, history, label='Historical Price', color='black')
+    ax.plot(forecast_df.index, forecast_df['Forecasted Price'], label='Forecasted Price', color='blue')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Gold Price')
+    ax.set_title('Gold Price Forecast')
+    ax.legend()
+    return fig
+
+
+def render_forecast_png(forecast_df, key=None):
+    """
+    Returns the forecast chart as PNG bytes, rendering it only on the first
+    request for a given key.
+
+    Args:
+        forecast_df (pd.DataFrame): Forecast indexed by Date with 'Forecasted Price'.
+        key (hashable, optional): Cache key; defaults to a hash of forecast_df.
+    Returns:
+        bytes: PNG image.
+    """
+    if key is None:
+        key = forecast_chart_key(forecast_df)
+    with _charts_lock:
+        png = _charts.get(key)
+        if png is not None:
+            _charts.move_to_end(key)
+            return png
+
+    buffer = io.BytesIO()
+    forecast_figure(forecast_df).savefig(buffer, format='png')
+    png = buffer.getvalue()
+
+    with _charts_lock:
+        _charts[key] = png
+        while len(_charts) > CHART_CACHE_ENTRIES:
+            _charts.popitem(last=False)
+    return png
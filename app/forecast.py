@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+
+class ForecastEngine:
+    """
+    Closed-form multi-day forecaster for the fitted linear model.
+
+    The model is linear in Price_Lag1 and the one-hot event columns, so after
+    folding the StandardScaler into the regression coefficients every forecast
+    step is the AR(1) recurrence
+
+        p[t] = a * p[t-1] + b + e[t]
+
+    where a is the lag weight, b the no-event constant and e[t] the extra
+    effect of the scenario's event type on the event date. The whole horizon
+    is then evaluated with NumPy for any number of scenarios at once.
+    """
+
+    def __init__(self, trained):
+        """
+        Args:
+            trained (dict): Model bundle returned by backend.train_model.
+        """
+        encoder = trained['encoder']
+        scaler = trained['scaler']
+        model = trained['model']
+        feature_columns = trained['feature_columns']
+        history = trained['history']
+
+        # Fold the scaler into the coefficients: y = w . x + c
+        weights = model.coef_ / scaler.scale_
+        constant = model.intercept_ - np.dot(weights, scaler.mean_)
+
+        # Effect of every known event code on the prediction; codes the encoder
+        # has not seen encode to all zeros and therefore have no effect.
+        event_names = encoder.get_feature_names_out(trained['event_columns'])
+        event_indices = [feature_columns.index(name) for name in event_names]
+        categories = encoder.categories_[0]
+        event_effects = {
+            int(code): weights[event_indices[i]] for i, code in enumerate(categories)
+        }
+        self._set_model(weights[feature_columns.index('Price_Lag1')], event_effects, constant, history)
+
+    @classmethod
+    def from_weights(cls, lag_weight, event_effects, constant, history):
+        """
+        Builds the engine from unscaled regression weights, e.g. those solved by
+        online.OnlineLinearModel.
+        Args:
+            lag_weight (float): Weight of Price_Lag1.
+            event_effects (dict): Event code -> weight of its one-hot column.
+            constant (float): Intercept.
+            history (pd.Series): Recent prices indexed by Date.
+        """
+        engine = cls.__new__(cls)
+        engine._set_model(lag_weight, event_effects, constant, history)
+        return engine
+
+    def _set_model(self, lag_weight, event_effects, constant, history):
+        self.lag_weight = float(lag_weight)
+        self.event_effects = {int(code): float(weight) for code, weight in event_effects.items()}
+        self.no_event_constant = constant + self.event_effects.get(-1, 0.0)
+
+        self.start_date = history.index[-1] + pd.Timedelta(days=1)
+        self.last_price = float(history.iloc[-1])
+
+    def event_effect(self, event_type):
+        """Returns the price shift caused by event_type relative to no event."""
+        return self.event_effects.get(int(event_type), 0.0) - self.event_effects.get(-1, 0.0)
+
+    def forecast_paths(self, event_dates, event_types, num_days):
+        """
+        Evaluates the forecast for many scenarios in one pass.
+
+        Args:
+            event_dates (array-like): Event date of each scenario.
+            event_types (array-like): Encoded event type of each scenario.
+            num_days (array-like): Days to forecast past each event date.
+        Returns:
+            tuple: (dates, prices, lengths) where prices is a
+            (scenarios x days) array, dates the shared DatetimeIndex of its
+            columns and lengths the number of valid days per scenario.
+        """
+        event_dates = pd.to_datetime(pd.Series(event_dates)).dt.normalize()
+        event_types = np.asarray(event_types, dtype=int)
+        num_days = np.asarray(num_days, dtype=int)
+
+        end_dates = event_dates + pd.to_timedelta(num_days, unit='D')
+        lengths = np.maximum((end_dates - self.start_date).dt.days.to_numpy() + 1, 0)
+        horizon = int(lengths.max()) if len(lengths) else 0
+        dates = pd.date_range(start=self.start_date, periods=horizon, freq='D')
+        if horizon == 0:
+            return dates, np.empty((len(lengths), 0)), lengths
+
+        a = self.lag_weight
+        steps = np.arange(1, horizon + 1)
+        powers = a ** steps
+        # sum_{i<t} a^i, accumulated instead of (1 - a^t) / (1 - a) to stay exact at a ~ 1
+        geometric = np.cumsum(a ** np.arange(horizon))
+        baseline = powers * self.last_price + geometric * self.no_event_constant
+
+        # The event kicks in on its own day and then decays through the lag term;
+        # an event dated before start_date falls outside the horizon and has no effect
+        event_steps = (event_dates - self.start_date).dt.days.to_numpy() + 1
+        effects = np.array([self.event_effect(t) for t in event_types])
+        since_event = steps[None, :] - event_steps[:, None]
+        in_horizon = (since_event >= 0) & (event_steps[:, None] >= 1)
+        decay = np.where(in_horizon, a ** np.maximum(since_event, 0), 0.0)
+
+        prices = baseline[None, :] + effects[:, None] * decay
+        return dates, prices, lengths
+
+    def forecast(self, future_event_date, future_event_type, num_days):
+        """Returns the forecast DataFrame for a single scenario."""
+        return self.forecast_batch([(future_event_date, future_event_type, num_days)])[0]
+
+    def forecast_batch(self, scenarios):
+        """
+        Args:
+            scenarios (list): (event_date, event_type, num_days) tuples.
+        Returns:
+            list: One forecast DataFrame per scenario, indexed by Date.
+        """
+        if not scenarios:
+            return []
+        event_dates, event_types, num_days = zip(*scenarios)
+        dates, prices, lengths = self.forecast_paths(event_dates, event_types, num_days)
+
+        forecasts = []
+        for row, length in zip(prices, lengths):
+            forecast_df = pd.DataFrame({'Date': dates[:length], 'Forecasted Price': row[:length]})
+            forecast_df.set_index('Date', inplace=True)
+            forecasts.append(forecast_df)
+        return forecasts
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ForecastJob:
+    """
+    Async handle for a submitted forecast. The page keeps it in its session
+    state and polls done(); identical in-flight requests share one handle.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout=timeout)
+
+    def exception(self):
+        return self.future.exception() if self.future.done() else None
+
+    def elapsed(self):
+        end = self.finished_at or time.monotonic()
+        return end - self.submitted_at
+
+    def timings(self):
+        """Returns queue and run time in seconds (None while not yet known)."""
+        queued = None
+        ran = None
+        if self.started_at is not None:
+            queued = self.started_at - self.submitted_at
+            if self.finished_at is not None:
+                ran = self.finished_at - self.started_at
+        return {'queue_seconds': queued, 'run_seconds': ran, 'total_seconds': self.elapsed()}
+
+
+class ForecastJobService:
+    """
+    Runs forecasts on a bounded thread pool so Streamlit script runs never
+    block on them. Jobs are keyed on their arguments, e.g. (future_event_date,
+    future_event_type, num_days); a request matching a job that is still
+    queued or running is coalesced onto it instead of being computed twice.
+
+    Threads rather than processes are used because the trained model lives
+    in the backend's in-process registry and the forecast itself is NumPy.
+    """
+
+    def __init__(self, forecast_fn, max_workers=4):
+        """
+        Args:
+            forecast_fn (callable): (future_event_date, future_event_type, num_days) -> result,
+                or any other arguments passed to submit().
+            max_workers (int): Number of forecasts computed concurrently.
+        """
+        self.forecast_fn = forecast_fn
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self._queue_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _run(self, job, args):
+        job.started_at = time.monotonic()
+        try:
+            return self.forecast_fn(*args)
+        finally:
+            job.finished_at = time.monotonic()
+            timings = job.timings()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+                self._queue_seconds += timings['queue_seconds']
+                self._run_seconds += timings['run_seconds']
+
+    def _record_outcome(self, future):
+        with self._lock:
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def submit(self, *args):
+        """
+        Args:
+            *args: Arguments for forecast_fn, e.g. (future_event_date, future_event_type, num_days).
+        Returns:
+            ForecastJob: Handle for a new job, or for the identical job in flight.
+        """
+        key = tuple(str(arg) for arg in args)
+        with self._lock:
+            self.submitted += 1
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.coalesced += 1
+                return job
+            job = ForecastJob(key)
+            self._in_flight[key] = job
+            job.future = self._executor.submit(self._run, job, args)
+        job.future.add_done_callback(self._record_outcome)
+        return job
+
+    def stats(self):
+        """Returns job counters and mean queue/run time for sizing the pool."""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                'workers': self.max_workers,
+                'in_flight': len(self._in_flight),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_queue_seconds': self._queue_seconds / finished if finished else 0.0,
+                'avg_run_seconds': self._run_seconds / finished if finished else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
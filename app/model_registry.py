@@ -0,0 +1,131 @@
+import os
+import pickle
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Keeps the fitted encoder, scaler and regressor in memory and on disk,
+    together with the data watermark they were trained on.
+
+    The watermark is a tuple (MAX(gold_features.Date), MAX(events.event_id)).
+    The model is only retrained when the current watermark differs from the
+    stored one, i.e. when the ETL has added new rows. If an update_fn is given it is tried
+    first, to bring the previous bundle up to date incrementally.
+    """
+
+    def __init__(self, train_fn, watermark_fn, cache_dir=None, check_interval=30.0, update_fn=None,
+                 cache_name="model"):
+        """
+        Args:
+            train_fn (callable): Fits and returns the trained model bundle.
+            watermark_fn (callable): Returns the current data watermark.
+            cache_dir (str): Directory used to persist the trained bundle.
+            check_interval (float): Seconds during which a watermark read is reused.
+            update_fn (callable, optional): previous bundle -> updated bundle,
+                or None when a full retrain is needed.
+            cache_name (str): File name (without .pkl) of the persisted bundle;
+                models trained under different settings need different names.
+        """
+        self.train_fn = train_fn
+        self.update_fn = update_fn
+        self.watermark_fn = watermark_fn
+        self.cache_dir = cache_dir or os.getenv("MODEL_CACHE_DIR", "model_cache")
+        self.cache_path = os.path.join(self.cache_dir, f"{cache_name}.pkl")
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._entry = None  # {'watermark': ..., 'trained': ...}
+        self._watermark = None
+        self._watermark_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.retrains = 0
+        self.updates = 0
+
+    def _current_watermark(self):
+        now = time.monotonic()
+        if self._watermark is None or now - self._watermark_checked_at >= self.check_interval:
+            self._watermark = self.watermark_fn()
+            self._watermark_checked_at = now
+        return self._watermark
+
+    def _load_from_disk(self):
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Ignoring unreadable model cache {self.cache_path}: {e}")
+            return None
+
+    def _save_to_disk(self, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Per-writer temporary file, so concurrent writers never replace each other's partial pickle
+        tmp_path = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+    def get(self):
+        """
+        Returns the trained model bundle for the current data watermark,
+        retraining only if the data has changed since the last fit.
+        """
+        return self.get_entry()["trained"]
+
+    def get_entry(self):
+        """
+        Returns {'watermark': ..., 'trained': ...} for the current data
+        watermark, so callers can key derived results on the same version.
+        """
+        watermark = self._current_watermark()
+        entry = self._entry
+        if entry is not None and entry["watermark"] == watermark:
+            self.hits += 1
+            return entry
+
+        with self._lock:
+            # Another thread may have refreshed the entry while we waited.
+            entry = self._entry
+            if entry is not None and entry["watermark"] == watermark:
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            previous = self._entry
+            entry = self._load_from_disk()
+            if entry is None or entry["watermark"] != watermark:
+                previous = previous or entry
+                trained = None
+                if self.update_fn is not None and previous is not None:
+                    trained = self.update_fn(previous["trained"])
+                    if trained is not None:
+                        self.updates += 1
+                if trained is None:
+                    trained = self.train_fn()
+                    self.retrains += 1
+                entry = {"watermark": watermark, "trained": trained}
+                self._save_to_disk(entry)
+            self._entry = entry
+            return entry
+
+    def invalidate(self):
+        """Forces the next get() to re-read the watermark."""
+        with self._lock:
+            self._watermark = None
+
+    def stats(self):
+        """Returns hit/miss/retrain/update counters and the cached watermark."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "retrains": self.retrains,
+            "updates": self.updates,
+            "hit_rate": self.hits / total if total else 0.0,
+            "watermark": self._entry["watermark"] if self._entry else None,
+        }
@@ -0,0 +1,96 @@
+import numpy as np
+
+from backtest import solve_normal_equations
+
+
+# Event codes produced by encode_top_15_event_types: -1 (no event), 0-14 (top 15), 15 (other)
+EVENT_CODES = np.arange(-1, 16)
+
+
+class OnlineLinearModel:
+    """
+    Online version of the regression fitted by backend.fit_model
+    (Price ~ Price_Lag1 + one-hot Encoded_Event_Type).
+
+    Only the sufficient statistics are kept: the row count, column sums,
+    X^T X, sum of y and X^T y. Adding rows costs O(rows x features^2)
+    regardless of how much history has been absorbed, and the weights are
+    solved from the statistics on demand. The solution is the same
+    minimum-norm least-squares fit a full refit finds, so predictions agree
+    with StandardScaler + LinearRegression on the same rows.
+    """
+
+    def __init__(self, categories=EVENT_CODES):
+        """
+        Args:
+            categories (array-like): Event codes given a one-hot column. Codes
+                that never occur in the absorbed rows get no weight, as with
+                OneHotEncoder(handle_unknown='ignore').
+        """
+        self.categories = np.asarray(categories)
+        k = 1 + len(self.categories)
+        self.count = 0
+        self.sum_x = np.zeros(k)
+        self.sum_xx = np.zeros((k, k))
+        self.sum_y = 0.0
+        self.sum_xy = np.zeros(k)
+        # Statistics are accumulated around the first batch's means to limit cancellation
+        self.shift_x = None
+        self.shift_y = None
+        self._solution = None
+
+    def design(self, data):
+        """Returns (X, y) for rows with Price, Price_Lag1 and Encoded_Event_Type."""
+        codes = data['Encoded_Event_Type'].to_numpy(dtype=np.int64)
+        onehot = (codes[:, None] == self.categories[None, :]).astype(np.float64)
+        X = np.column_stack([data['Price_Lag1'].to_numpy(dtype=np.float64), onehot])
+        y = data['Price'].to_numpy(dtype=np.float64)
+        return X, y
+
+    def update(self, data):
+        """Absorbs new training rows."""
+        if len(data) == 0:
+            return
+        X, y = self.design(data)
+        if self.shift_x is None:
+            self.shift_x = X.mean(axis=0)
+            self.shift_y = y.mean()
+        X = X - self.shift_x
+        y = y - self.shift_y
+        self.count += len(y)
+        self.sum_x += X.sum(axis=0)
+        self.sum_xx += X.T @ X
+        self.sum_y += y.sum()
+        self.sum_xy += X.T @ y
+        self._solution = None
+
+    def solve(self):
+        """
+        Returns:
+            tuple: (weights, intercept) in the original (unshifted) feature space.
+        """
+        if self.count == 0:
+            raise ValueError("OnlineLinearModel has no rows")
+        if self._solution is None:
+            weights, intercept = solve_normal_equations(
+                self.count, self.sum_x, self.sum_xx, self.sum_y, self.sum_xy
+            )
+            self._solution = (weights, float(intercept + self.shift_y - weights @ self.shift_x))
+        return self._solution
+
+    def scaler_stats(self):
+        """Returns the per-feature mean and variance a StandardScaler would learn."""
+        mean = self.sum_x / self.count
+        variance = np.diag(self.sum_xx) / self.count - mean ** 2
+        return mean + self.shift_x, np.clip(variance, 0, None)
+
+    def event_effects(self):
+        """Returns event code -> weight of its one-hot column."""
+        weights, _ = self.solve()
+        return {int(code): weights[1 + i] for i, code in enumerate(self.categories)}
+
+    def predict(self, data):
+        """Returns one-step predictions for rows with Price_Lag1 and Encoded_Event_Type."""
+        weights, intercept = self.solve()
+        X, _ = self.design(data)
+        return X @ weights + intercept
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+# Where the startup report is written (empty to only print it)
+STARTUP_REPORT_PATH = os.getenv("STARTUP_REPORT_PATH", os.path.join("cache", "startup_report.json"))
+
+# What app.py imported at module level before heavy imports were deferred, and what it imports now
+EAGER_IMPORTS = ["streamlit", "pandas", "matplotlib.pyplot", "sklearn.linear_model", "backend", "charts"]
+LAZY_IMPORTS = ["streamlit", "jobs"]
+
+_TIMING_SCRIPT = """
+import importlib, json, sys, time
+timings = {}
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    t = time.perf_counter()
+    importlib.import_module(name)
+    timings[name] = time.perf_counter() - t
+print(json.dumps({'modules': timings, 'total_seconds': time.perf_counter() - started}))
+"""
+
+
+def measure_imports(modules):
+    """
+    Imports `modules` in order in a fresh interpreter and returns the time
+    each one added, so already-loaded dependencies are not counted twice.
+
+    Args:
+        modules (list): Module names to import.
+    Returns:
+        dict: {'modules': {name: seconds}, 'total_seconds': float}, or an
+        'error' entry if one of the imports failed.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMING_SCRIPT, *modules],
+        cwd=here, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+    return json.loads(result.stdout)
+
+
+def startup_report():
+    """
+    Compares module-level import time of the eager and the deferred app.
+    Only imports are measured: work a script run triggers (such as the first
+    get_backend() call) is not, so the page must not need the backend to render.
+    """
+    eager = measure_imports(EAGER_IMPORTS)
+    lazy = measure_imports(LAZY_IMPORTS)
+    report = {'eager_imports': eager, 'lazy_imports': lazy}
+    if 'total_seconds' in eager and 'total_seconds' in lazy:
+        report['import_seconds_saved'] = eager['total_seconds'] - lazy['total_seconds']
+    return report
+
+
+def write_report(report, save=True):
+    print(json.dumps(report, indent=2, default=str))
+    if save and STARTUP_REPORT_PATH:
+        os.makedirs(os.path.dirname(STARTUP_REPORT_PATH) or ".", exist_ok=True)
+        with open(STARTUP_REPORT_PATH, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+# The container runs this before starting Streamlit, so the snapshot and the model are
+# on disk before the first page load and only one process ever writes them at a time.
+# "report" adds the import-time report (STARTUP_REPORT=1), "--no-prewarm" skips the prewarm
+if __name__ == "__main__":
+    report = startup_report() if "report" in sys.argv[1:] else {}
+    if "--no-prewarm" not in sys.argv[1:]:
+        started = time.perf_counter()
+        try:
+            from backend import prewarm
+            report['prewarm'] = prewarm()
+        except Exception as e:
+            # The page still works without a warm cache; the first forecast trains instead
+            report['prewarm'] = {'error': str(e)}
+        report['prewarm_total_seconds'] = time.perf_counter() - started
+    write_report(report, save="report" in sys.argv[1:])
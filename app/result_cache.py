@@ -0,0 +1,174 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode()).hexdigest()[:16]
+
+
+class ForecastCache:
+    """
+    LRU/TTL cache of forecast DataFrames keyed on
+    (future_event_date, event type code, num_days, data watermark).
+
+    The in-memory tier is bounded by the total size of the cached frames.
+    An optional on-disk tier keeps pickled entries across restarts; disk files
+    are prefixed with digests of the cache name and of their watermark, so
+    that everything this cache computed for an older watermark can be dropped
+    without opening the files or touching other caches sharing the directory.
+    The disk tier is bounded too and evicts its oldest files first.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600.0, disk_dir=None, max_disk_bytes=256 * 1024 * 1024,
+                 name="forecast"):
+        """
+        Args:
+            max_bytes (int): Memory budget for cached frames.
+            ttl (float): Seconds an entry stays valid (0 disables expiry).
+            disk_dir (str, optional): Directory for the on-disk tier.
+            max_disk_bytes (int): Size budget for this cache's disk files.
+            name (str): Cache name; caches for different model settings that
+                share disk_dir need different names.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._prefix = _digest(name) + "-"
+        self._entries = OrderedDict()  # key -> (created_at, nbytes, value)
+        self._bytes = 0
+        self._watermark = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{self._prefix}{_digest(key[-1])}-{_digest(key)}.pkl")
+
+    def _disk_files(self):
+        """Returns (mtime, size, path) of this cache's disk files, oldest first."""
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.startswith(self._prefix) and name.endswith(".pkl"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files)
+
+    def _trim_disk(self):
+        files = self._disk_files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def _expired(self, created_at):
+        return self.ttl and time.time() - created_at > self.ttl
+
+    def _store(self, key, created_at, value):
+        nbytes = int(value.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (created_at, nbytes, value)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_bytes
+            self.evictions += 1
+
+    def set_watermark(self, watermark):
+        """
+        Drops every entry computed for a different data watermark, in memory
+        and on disk. Cheap when the watermark has not changed.
+        """
+        with self._lock:
+            if watermark == self._watermark:
+                return
+            self._watermark = watermark
+            for key in [k for k in self._entries if k[-1] != watermark]:
+                self._bytes -= self._entries.pop(key)[1]
+            if self.disk_dir and os.path.isdir(self.disk_dir):
+                current = self._prefix + _digest(watermark) + "-"
+                for _, _, path in self._disk_files():
+                    if not os.path.basename(path).startswith(current):
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+
+    def get(self, key):
+        """Returns the cached forecast for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._bytes -= self._entries.pop(key)[1]
+
+            if self.disk_dir:
+                path = self._path(key)
+                try:
+                    with open(path, "rb") as f:
+                        stored_key, created_at, value = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    stored_key = None
+                if stored_key == key and not self._expired(created_at):
+                    self._store(key, created_at, value)
+                    # Recently read files are evicted last
+                    try:
+                        os.utime(path)
+                    except OSError:
+                        pass
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        created_at = time.time()
+        with self._lock:
+            self._store(key, created_at, value)
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((key, created_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._trim_disk()
+
+    def stats(self):
+        """Returns hit/miss counters, hit rate and memory usage."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,163 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Simulated forecast paths per sweep
+SIMULATION_PATHS = int(os.getenv("SIMULATION_PATHS", "5000"))
+# Upper bound on the simulated (paths x days) block held in memory at once
+SIMULATION_CHUNK_MB = float(os.getenv("SIMULATION_CHUNK_MB", "32"))
+# Percentiles reported for every forecast day and for the final price
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def scenario_grid(event_dates, event_types, num_days):
+    """Returns every (event_date, event_type, num_days) combination, dates outermost."""
+    return [(date, int(event_type), int(num_days)) for date in event_dates for event_type in event_types]
+
+
+def residual_sampler(residuals, method, rng):
+    """
+    Args:
+        residuals (np.ndarray): One-step residuals of the fitted model.
+        method (str): "bootstrap" resamples the residuals, "gaussian" draws
+            normal shocks with their standard deviation.
+        rng (np.random.Generator): Random source.
+    Returns:
+        callable: shape -> array of simulated one-step shocks.
+    """
+    residuals = np.asarray(residuals, dtype=np.float64)
+    if method == "bootstrap":
+        return lambda shape: residuals[rng.integers(0, len(residuals), shape)]
+    if method == "gaussian":
+        sigma = residuals.std()
+        return lambda shape: rng.standard_normal(shape) * sigma
+    raise ValueError(f"Unknown simulation method: {method}")
+
+
+def simulate_noise(lag_weight, draw, paths, horizon, percentiles, keep_days=(), chunk_days=None):
+    """
+    Simulates the accumulated forecast error N[t] = a * N[t-1] + eps[t] of
+    `paths` paths, a block of days at a time so memory stays at
+    (chunk_days x paths) whatever the horizon.
+    Args:
+        lag_weight (float): Lag coefficient a of the AR(1) forecast recurrence.
+        draw (callable): shape -> one-step shocks (see residual_sampler).
+        paths (int): Number of simulated paths.
+        horizon (int): Number of forecast days.
+        percentiles (sequence): Percentiles computed for every day.
+        keep_days (iterable): Day indices whose full samples are returned.
+        chunk_days (int, optional): Days simulated per block.
+    Returns:
+        tuple: ((percentiles x horizon) quantiles, {day: sorted samples})
+    """
+    if chunk_days is None:
+        chunk_days = max(1, int(SIMULATION_CHUNK_MB * 1024 * 1024) // (8 * paths))
+    keep_days = set(int(day) for day in keep_days)
+
+    quantiles = np.empty((len(percentiles), horizon))
+    kept = {}
+    state = np.zeros(paths)
+    for start in range(0, horizon, chunk_days):
+        # Rows are days, so each step of the recurrence works on a contiguous row
+        block = draw((min(chunk_days, horizon - start), paths))
+        for row in block:
+            state = lag_weight * state + row
+            row[:] = state
+        quantiles[:, start:start + len(block)] = np.percentile(block, percentiles, axis=1)
+        for day in keep_days.intersection(range(start, start + len(block))):
+            kept[day] = np.sort(block[day - start])
+    return quantiles, kept
+
+
+def simulate_scenarios(engine, residuals, scenarios, paths=None, method="bootstrap",
+                       percentiles=BAND_PERCENTILES, seed=None):
+    """
+    Monte Carlo forecast bands for many scenarios in one call.
+
+    Event effects are deterministic in the linear model, so the simulated
+    paths of a scenario are its point forecast plus forecast noise that does
+    not depend on the scenario. The noise paths are simulated once and shared
+    by every scenario (common random numbers), which makes the comparison
+    between event types free of simulation noise and keeps a sweep over
+    hundreds of scenarios as cheap as a single one.
+
+    Args:
+        engine (forecast.ForecastEngine): Fitted forecast engine.
+        residuals (np.ndarray): One-step residuals to bootstrap from.
+        scenarios (list): (event_date, event_type, num_days) tuples, e.g.
+            from scenario_grid.
+        paths (int, optional): Simulated paths (SIMULATION_PATHS by default).
+        method (str): "bootstrap" or "gaussian".
+        percentiles (sequence): Band percentiles.
+        seed (int, optional): Random seed for reproducible bands.
+    Returns:
+        dict: dates (DatetimeIndex of the forecast days), bands
+        (scenarios x percentiles x days, NaN past each scenario's last day),
+        scenarios and comparison DataFrames, and timing.
+    """
+    started = time.perf_counter()
+    paths = paths or SIMULATION_PATHS
+    event_dates, event_types, num_days = zip(*scenarios)
+    dates, prices, lengths = engine.forecast_paths(event_dates, event_types, num_days)
+    horizon = prices.shape[1]
+
+    # The no-event path is the baseline each event's effect is measured against
+    _, baseline, _ = engine.forecast_paths([engine.start_date], [-1], [max(horizon - 1, 0)])
+    baseline = baseline[0]
+
+    final_days = lengths - 1
+    draw = residual_sampler(residuals, method, np.random.default_rng(seed))
+    noise_quantiles, final_noise = simulate_noise(
+        engine.lag_weight, draw, paths, horizon, percentiles, keep_days=final_days[final_days >= 0]
+    )
+
+    valid = np.arange(horizon)[None, :] < lengths[:, None]
+    bands = np.where(valid[:, None, :], prices[:, None, :] + noise_quantiles[None, :, :], np.nan)
+
+    # Final-day distribution of every scenario from the shared noise samples
+    final_stats = {
+        day: (samples.mean(), np.percentile(samples, percentiles)) for day, samples in final_noise.items()
+    }
+    rows = []
+    for i, day in enumerate(final_days):
+        row = {
+            'Event_Date': pd.Timestamp(event_dates[i]).normalize(),
+            'Encoded_Event_Type': int(event_types[i]),
+            'Days': int(num_days[i]),
+        }
+        if day >= 0:
+            point = prices[i, day]
+            mean, quantiles = final_stats[day]
+            row['Final_Date'] = dates[day]
+            row['Expected_Price'] = point + mean
+            row.update({f'P{p:g}': point + value for p, value in zip(percentiles, quantiles)})
+            # P(price > last close) = P(noise > last close - point forecast), read off the sorted samples
+            above = paths - np.searchsorted(final_noise[day], engine.last_price - point, side='right')
+            row['Prob_Above_Current'] = above / paths
+            row['Effect_vs_No_Event'] = point - baseline[day]
+        rows.append(row)
+    comparison = pd.DataFrame(rows)
+
+    return {
+        'dates': dates,
+        'percentiles': tuple(percentiles),
+        'bands': bands,
+        'scenarios': comparison[['Event_Date', 'Encoded_Event_Type', 'Days']],
+        'comparison': comparison,
+        'paths': paths,
+        'method': method,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def band_frame(result, index):
+    """Returns the percentile bands of one scenario as a DataFrame indexed by Date."""
+    bands = result['bands'][index]
+    frame = pd.DataFrame(
+        bands.T, index=result['dates'], columns=[f'P{p:g}' for p in result['percentiles']]
+    )
+    frame.index.name = 'Date'
+    return frame.dropna(how='all')
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+
+# Compact column types used for the local snapshots
+GOLD_SCHEMA = pa.schema([
+    ('Date', pa.date32()),
+    ('Price', pa.float32()),
+    ('Change %', pa.float32()),
+])
+
+EVENTS_SCHEMA = pa.schema([
+    ('event_id', pa.int32()),
+    ('Date', pa.date32()),
+    ('Type_of_Event', pa.dictionary(pa.int32(), pa.string())),
+    ('Outcome', pa.dictionary(pa.int32(), pa.string())),
+])
+
+
+class ArrowSnapshot:
+    """
+    Append-only local copy of a MySQL table stored as Arrow IPC files.
+
+    Every refresh writes the rows past the current watermark into a new part
+    file; parts are memory-mapped on load, so reading the snapshot does not
+    copy the column buffers into Python objects. Once more than `max_parts`
+    parts accumulate they are compacted into a single file.
+    """
+
+    def __init__(self, directory, name, schema, watermark_column, max_parts=16):
+        """
+        Args:
+            directory (str): Directory holding the snapshot files.
+            name (str): Table name, used as the file prefix.
+            schema (pa.Schema): Columns and compact types to keep.
+            watermark_column (str): Monotonic column used for incremental refresh.
+            max_parts (int): Number of part files that triggers a compaction.
+        """
+        self.directory = directory
+        self.name = name
+        self.schema = schema
+        self.watermark_column = watermark_column
+        self.max_parts = max_parts
+        self.manifest_path = os.path.join(directory, f"{name}.json")
+        self._lock = threading.Lock()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'parts': [], 'watermark': None, 'next_part': 0}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _to_table(self, df):
+        columns = {}
+        for field in self.schema:
+            values = df[field.name]
+            if pa.types.is_dictionary(field.type):
+                columns[field.name] = pa.array(values, type=pa.string(), from_pandas=True).dictionary_encode()
+            else:
+                columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+        return pa.table(columns)
+
+    def _write_part(self, manifest, table):
+        part = f"{self.name}-{manifest['next_part']:05d}.arrow"
+        with pa.OSFile(os.path.join(self.directory, part), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        manifest['next_part'] += 1
+        return part
+
+    def _read_parts(self, parts):
+        tables = []
+        for part in parts:
+            source = pa.memory_map(os.path.join(self.directory, part), 'r')
+            tables.append(pa.ipc.open_file(source).read_all())
+        return tables
+
+    def watermark(self):
+        """Returns the largest watermark column value stored in the snapshot."""
+        watermark = self._read_manifest()['watermark']
+        if watermark is not None and pa.types.is_date(self.schema.field(self.watermark_column).type):
+            return pd.Timestamp(watermark).date()
+        return watermark
+
+    def _past_watermark(self, df, watermark):
+        if watermark is None:
+            return df
+        values = df[self.watermark_column]
+        if pa.types.is_date(self.schema.field(self.watermark_column).type):
+            return df[pd.to_datetime(values) > pd.Timestamp(watermark)]
+        return df[values > watermark]
+
+    def append(self, df):
+        """
+        Appends rows that are past the current watermark. Rows at or below it
+        are dropped, so overlapping refreshes that fetched the same rows
+        against an older watermark do not store them twice.
+        Args:
+            df (pd.DataFrame): Rows fetched from MySQL.
+        Returns:
+            int: Number of rows written.
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            manifest = self._read_manifest()
+            df = self._past_watermark(df, manifest['watermark'])
+            if df.empty:
+                return 0
+
+            table = self._to_table(df)
+            manifest['parts'].append(self._write_part(manifest, table))
+            latest = df[self.watermark_column].max()
+            manifest['watermark'] = latest.isoformat() if hasattr(latest, 'isoformat') else int(latest)
+
+            if len(manifest['parts']) > self.max_parts:
+                old_parts = manifest['parts']
+                merged = pa.concat_tables(self._read_parts(old_parts)).unify_dictionaries()
+                manifest['parts'] = [self._write_part(manifest, merged.combine_chunks())]
+                self._write_manifest(manifest)
+                for part in old_parts:
+                    os.remove(os.path.join(self.directory, part))
+            else:
+                self._write_manifest(manifest)
+            return len(df)
+
+    def load(self, columns=None):
+        """
+        Loads the snapshot through memory-mapped Arrow files.
+        Args:
+            columns (list, optional): Subset of columns to materialize.
+        Returns:
+            pd.DataFrame: Snapshot rows with compact dtypes.
+        """
+        # Compaction removes part files, so they are mapped under the lock
+        with self._lock:
+            parts = self._read_manifest()['parts']
+            if not parts:
+                return self.schema.empty_table().to_pandas(date_as_object=False)
+            table = pa.concat_tables(self._read_parts(parts))
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(date_as_object=False, split_blocks=True)
@@ -0,0 +1,354 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in ("common", "app", "etl"):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+import backend  # noqa: E402
+import etl  # noqa: E402
+import simulation  # noqa: E402
+from synthetic import generate_prices, generate_gold_table, generate_events, events_to_csv  # noqa: E402
+
+
+# Tables the benchmarked stages read and write, valid for both SQLite and MySQL
+SCHEMA = [
+    "CREATE TABLE gold (`Date` DATE NOT NULL, `Price` DOUBLE, `Open` DOUBLE, `High` DOUBLE, "
+    "`Low` DOUBLE, `Change %` DOUBLE, `Source` TEXT, PRIMARY KEY (`Date`))",
+    "CREATE TABLE events (`event_id` INT NOT NULL, `Name_of_Incident` VARCHAR(255), `Date` DATE, "
+    "`Country` VARCHAR(100), `Type_of_Event` VARCHAR(100), `Outcome` VARCHAR(50), PRIMARY KEY (`event_id`))",
+    "CREATE INDEX idx_events_date ON events (`Date`)",
+]
+
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(pd.Timestamp, lambda t: t.date().isoformat())
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float64, float)
+
+
+def to_sqlite(sql):
+    """Rewrites the MySQL dialect used by the ETL and backend for SQLite."""
+    sql = sql.replace("%s", "?")
+    sql = sql.replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+    return re.sub(r"VALUES\((`[^`]+`)\)", r"excluded.\1", sql)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, sql, params=()):
+        return self._cursor.execute(to_sqlite(sql), tuple(params or ()))
+
+    def executemany(self, sql, rows):
+        return self._cursor.executemany(to_sqlite(sql), rows)
+
+
+class SQLiteConnection:
+    """
+    In-memory SQLite database behind the DB-API calls the backend and ETL make,
+    so the benchmark needs neither MySQL nor network access. close() keeps the
+    database open because every stage shares it.
+    """
+
+    def __init__(self, path=":memory:"):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self):
+        return SQLiteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_database(kind, mysql_database):
+    """
+    Returns a create_connection() callable for the chosen database.
+    For MySQL the pool is pointed at `mysql_database`, whose gold and events
+    tables are dropped and recreated by the benchmark.
+    """
+    if kind == "sqlite":
+        connection = SQLiteConnection()
+        return lambda: connection
+    from db import configure_pool
+    return configure_pool(size=2, database=mysql_database).create_connection
+
+
+def reset_tables(create_connection):
+    connection = create_connection()
+    cursor = connection.cursor()
+    for table in ("gold", "events"):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def clear_table(create_connection, table):
+    connection = create_connection()
+    cursor = connection.cursor()
+    cursor.execute(f"DELETE FROM {table}")
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def time_stage(fn, repeat, setup=None, warmup=1):
+    """
+    Runs fn `warmup` untimed times and then `repeat` timed times, calling
+    setup() (not timed) before each run. Returns the timings together with
+    the row count of the last result.
+    """
+    seconds = []
+    result = None
+    for run in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        # The stages print progress; keep it out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - started
+        if run >= warmup:
+            seconds.append(elapsed)
+    stage = {
+        'min_seconds': min(seconds),
+        'median_seconds': statistics.median(seconds),
+        'runs': seconds,
+    }
+    if isinstance(result, pd.DataFrame):
+        stage['rows'] = len(result)
+    elif isinstance(result, int):
+        stage['rows'] = result
+    return stage, result
+
+
+# Lookback of the windowed fetch stages
+WINDOW_YEARS = 5
+
+
+def loop_forecast(trained, future_event_date, future_event_type, num_days):
+    """The original day-by-day forecast loop, kept as the reference for ForecastEngine."""
+    encoder, scaler, model = trained['encoder'], trained['scaler'], trained['model']
+    feature_columns = trained['feature_columns']
+    event_names = encoder.get_feature_names_out(trained['event_columns'])
+    start_date = trained['history'].index[-1] + pd.Timedelta(days=1)
+    end_date = pd.to_datetime(future_event_date) + pd.Timedelta(days=num_days)
+    all_dates = pd.date_range(start=start_date, end=end_date, freq='D')
+
+    prev_price = trained['history'].iloc[-1]
+    future_prices = []
+    for date in all_dates:
+        features = {col: 0 for col in feature_columns}
+        event_type_value = future_event_type if date == pd.to_datetime(future_event_date) else -1
+        encoded_event = encoder.transform(pd.DataFrame({trained['event_columns'][0]: [event_type_value]}))
+        for idx, col in enumerate(event_names):
+            features[col] = encoded_event[0][idx]
+        features['Price_Lag1'] = prev_price
+        features_df = pd.DataFrame([features], index=[date])[feature_columns]
+        prev_price = model.predict(scaler.transform(features_df))[0]
+        future_prices.append(prev_price)
+    return pd.Series(future_prices, index=all_dates)
+
+
+def check_forecast_engine(trained, tolerance=1e-6):
+    """
+    Raises AssertionError if the closed-form engine differs from the per-day
+    loop, for events before, on and after the first forecast day.
+    """
+    engine = trained['engine']
+    for offset in (-3, -1, 0, 1, 10):
+        for code in (-1, 0, 3, 15):
+            event_date = engine.start_date + pd.Timedelta(days=offset)
+            expected = loop_forecast(trained, event_date, code, 20)
+            actual = engine.forecast(event_date, code, 20)['Forecasted Price']
+            assert actual.index.equals(expected.index), f"Forecast dates differ for offset {offset}, type {code}"
+            error = np.max(np.abs(actual.to_numpy() - expected.to_numpy()), initial=0.0)
+            assert error <= tolerance, f"Forecast differs by {error:g} for offset {offset}, type {code}"
+
+
+def run_scale(years, event_count, repeat, create_connection, seed=0):
+    """Benchmarks every ETL and backend stage at one data scale."""
+    prices = generate_prices(years, seed)
+    gold_table = generate_gold_table(years, seed)
+    events = generate_events(event_count, years, seed)
+    events_csv = events_to_csv(events)
+    stages = {}
+
+    # ETL: transform
+    stages['etl.calculate_change_percentage'], gold_rows = time_stage(
+        lambda: etl.calculate_change_percentage(prices.reset_index()), repeat)
+    stages['etl.read_new_events'], new_events = time_stage(
+        lambda: etl.read_new_events(io.BytesIO(events_csv), 0)[0], repeat)
+    stages['etl.compute_gold_features'], _ = time_stage(
+        lambda: etl.compute_gold_features(gold_table[['Date', 'Price', 'Change %']]), repeat)
+
+    # ETL: store (into empty tables each run)
+    stages['etl.store_gold'], _ = time_stage(
+        lambda: etl.store_gold_data_in_mysql(gold_rows), repeat, lambda: clear_table(create_connection, 'gold'))
+    stages['etl.store_events'], _ = time_stage(
+        lambda: etl.store_events_data_in_mysql(new_events), repeat, lambda: clear_table(create_connection, 'events'))
+
+    # Backend: fetch -> prepare_features -> fit -> forecast
+    stages['backend.fetch_gold'], gold_df = time_stage(backend.fetch_gold_data_from_mysql, repeat)
+    stages['backend.fetch_events'], events_df = time_stage(backend.fetch_events_data_from_mysql, repeat)
+    # The same reads restricted to a fixed window, whose cost should not grow with the history
+    window_start = (pd.Timestamp(gold_table['Date'].max()) - pd.DateOffset(years=WINDOW_YEARS)).date()
+    stages['backend.fetch_gold_window'], _ = time_stage(
+        lambda: backend.fetch_gold_data_from_mysql(start_date=window_start), repeat)
+    stages['backend.fetch_events_window'], _ = time_stage(
+        lambda: backend.fetch_events_data_from_mysql(start_date=window_start), repeat)
+    stages['backend.prepare_features'], training_data = time_stage(
+        lambda: backend.prepare_features(gold_df.copy(), events_df.copy()), repeat)
+    stages['backend.fit_model'], trained = time_stage(lambda: backend.fit_model(training_data), repeat)
+
+    check_forecast_engine(trained)
+
+    engine = trained['engine']
+    event_date = engine.start_date + pd.Timedelta(days=30)
+    stages['backend.forecast'], _ = time_stage(lambda: engine.forecast(event_date, 0, 365), repeat)
+    scenarios = [
+        (engine.start_date + pd.Timedelta(days=offset), code, 30)
+        for offset in range(0, 90, 3) for code in range(-1, 16)
+    ]
+    stages['backend.forecast_batch'], _ = time_stage(lambda: engine.forecast_batch(scenarios), repeat)
+    stages['backend.forecast_batch']['scenarios'] = len(scenarios)
+    stages['backend.simulate'], _ = time_stage(
+        lambda: simulation.simulate_scenarios(engine, trained['residuals'], scenarios, seed=0), repeat)
+    stages['backend.simulate']['scenarios'] = len(scenarios)
+
+    return {
+        'years': years,
+        'events': event_count,
+        'gold_rows': len(gold_table),
+        'stages': stages,
+    }
+
+
+def run_metadata(database):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'database': database,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+# Slowdowns smaller than this are treated as timer noise
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def compare(results, baseline_path, threshold):
+    """
+    Prints the best-run time ratio of every stage against a previous results
+    file and returns the stages that got slower than `threshold` allows.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r['years'], r['events']): r['stages'] for r in baseline['results']}
+
+    regressions = []
+    for result in results['results']:
+        old_stages = previous.get((result['years'], result['events']))
+        if old_stages is None:
+            continue
+        for name, stage in result['stages'].items():
+            if name not in old_stages:
+                continue
+            old_seconds = old_stages[name]['min_seconds']
+            ratio = stage['min_seconds'] / max(old_seconds, 1e-9)
+            slower = stage['min_seconds'] - old_seconds > MIN_REGRESSION_SECONDS
+            flag = "  REGRESSION" if ratio > 1 + threshold and slower else ""
+            print(f"{result['years']:>4}y {result['events']:>8}ev  {name:<36} {ratio:6.2f}x{flag}")
+            if flag:
+                regressions.append((result['years'], result['events'], name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ETL and forecast paths on synthetic data.")
+    parser.add_argument("--years", type=int, nargs="+", default=[10, 50, 100],
+                        help="Lengths of the daily price history to generate.")
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 100000],
+                        help="Numbers of events to generate.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (min and median are reported).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", choices=["sqlite", "mysql"], default="sqlite",
+                        help="In-memory SQLite, or a scratch MySQL database using the MYSQL_* variables.")
+    parser.add_argument("--mysql-database", default="benchmark",
+                        help="MySQL database whose gold/events tables are recreated.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--compare", help="Previous results file to compare stage times against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown of the best run reported as a regression by --compare.")
+    args = parser.parse_args(argv)
+
+    # pandas warns about plain DB-API connections that are not sqlite3/SQLAlchemy
+    warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+
+    create_connection = open_database(args.db, args.mysql_database)
+    etl.create_connection = create_connection
+    backend.create_connection = create_connection
+
+    results = {'meta': run_metadata(args.db), 'results': []}
+    for years in args.years:
+        for event_count in args.events:
+            print(f"Benchmarking {years} years x {event_count} events...", file=sys.stderr)
+            reset_tables(create_connection)
+            results['results'].append(run_scale(years, event_count, args.repeat, create_connection, args.seed))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+
+# Event categories in rough order of frequency; the tail exercises the "Other" bucket
+EVENT_TYPES = [
+    "Political", "Disaster", "Terrorism", "Military Action", "Diplomatic/International",
+    "Economic", "Legislative/Judicial", "Legislation", "Aviation", "Peace Process", "Sports",
+    "Scientific/Exploration", "International Sports Event", "Independence", "Revolution",
+    "Health", "Cultural", "Technology", "Environmental", "Religious", "Crime", "Space",
+]
+OUTCOMES = ["Positive", "Negative", "Neutral", "Mixed"]
+COUNTRIES = ["USA", "UK", "India", "China", "Russia", "Germany", "France", "Japan", "Brazil", "South Africa"]
+
+
+def trading_days(years, end_date="2024-12-31"):
+    """Returns `years` years of business days ending at end_date."""
+    end = pd.Timestamp(end_date)
+    start = end - pd.DateOffset(years=years) + pd.Timedelta(days=1)
+    return pd.bdate_range(start=start, end=end, name='Date')
+
+
+def generate_prices(years, seed=0, end_date="2024-12-31", start_price=300.0):
+    """
+    Generates a deterministic daily gold series shaped like a yfinance download
+    (Date index; Open, High, Low, Close, Adj Close, Volume).
+
+    Args:
+        years (int): Length of the series in years of business days.
+        seed (int): Random seed; the same arguments always give the same frame.
+        end_date (str): Last date of the series.
+        start_price (float): Price on the first day.
+    Returns:
+        pd.DataFrame: One row per business day.
+    """
+    rng = np.random.default_rng(seed)
+    dates = trading_days(years, end_date)
+    returns = rng.normal(0.0002, 0.01, len(dates))
+    close = start_price * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.005, len(dates))) * close
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, len(dates))),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1000, 100000, len(dates)).astype(float),
+    }, index=dates)
+
+
+def generate_gold_table(years, seed=0, end_date="2024-12-31"):
+    """Returns rows shaped like the gold table (Date, Price, Open, High, Low, Change %, Source)."""
+    prices = generate_prices(years, seed, end_date)
+    return pd.DataFrame({
+        'Date': prices.index.date,
+        'Price': prices['Close'].to_numpy(),
+        'Open': prices['Open'].to_numpy(),
+        'High': prices['High'].to_numpy(),
+        'Low': prices['Low'].to_numpy(),
+        'Change %': prices['Close'].pct_change().fillna(0).to_numpy() * 100,
+        'Source': 'Synthetic',
+    })
+
+
+def generate_events(count, years, seed=0, end_date="2024-12-31"):
+    """
+    Generates `count` events spread over the same date range as the prices,
+    with a skewed type distribution and several events on busy days.
+
+    Args:
+        count (int): Number of events.
+        years (int): Span of event dates in years.
+        seed (int): Random seed.
+        end_date (str): Last possible event date.
+    Returns:
+        pd.DataFrame: Rows shaped like the events table.
+    """
+    rng = np.random.default_rng(seed + 1)
+    dates = trading_days(years, end_date)
+    # Zipf-like weights so a few types dominate, as in the real data
+    weights = 1.0 / np.arange(1, len(EVENT_TYPES) + 1)
+    weights /= weights.sum()
+
+    event_ids = np.arange(1, count + 1)
+    return pd.DataFrame({
+        'event_id': event_ids,
+        'Name_of_Incident': pd.Series(event_ids).map("Synthetic incident {}".format).to_numpy(),
+        'Date': dates[rng.integers(0, len(dates), count)].date,
+        'Country': np.array(COUNTRIES, dtype=object)[rng.integers(0, len(COUNTRIES), count)],
+        'Type_of_Event': np.array(EVENT_TYPES, dtype=object)[rng.choice(len(EVENT_TYPES), count, p=weights)],
+        'Outcome': np.array(OUTCOMES, dtype=object)[rng.integers(0, len(OUTCOMES), count)],
+    })
+
+
+def events_to_csv(events):
+    """Returns events as CSV bytes with the headers of the published GitHub file."""
+    csv = events.rename(columns={
+        'Name_of_Incident': 'Name of Incident',
+        'Type_of_Event': 'Type of Event',
+    })
+    buffer = io.StringIO()
+    csv.to_csv(buffer, index=False)
+    return buffer.getvalue().encode()
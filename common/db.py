@@ -0,0 +1,313 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+
+# Pool settings shared by the app and the ETL
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "30"))
+# Connections idle for longer than this are pinged before being handed out
+MYSQL_HEALTH_CHECK_INTERVAL = float(os.getenv("MYSQL_HEALTH_CHECK_INTERVAL", "30"))
+# Rows fetched per batch by read_sql_chunked
+MYSQL_FETCH_ROWS = int(os.getenv("MYSQL_FETCH_ROWS", "10000"))
+
+
+def connection_settings():
+    """
+    Returns the mysql.connector arguments built from environment variables.
+    """
+    return {
+        'user': os.getenv("MYSQL_USER"),
+        'password': os.getenv("MYSQL_PASSWORD"),
+        'host': os.getenv("MYSQL_HOST"),
+        'database': 'project',
+    }
+
+
+class _Slot:
+    """A physical connection owned by the pool plus its prepared cursors."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+        self.prepared = {}
+
+    def reset_prepared(self):
+        for cursor in self.prepared.values():
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+        self.prepared = {}
+
+
+class PooledConnection:
+    """
+    Proxy handed out by ConnectionPool.create_connection(). It behaves like a
+    mysql.connector connection, except that close() returns the underlying
+    connection to the pool instead of closing the socket.
+    """
+
+    def __init__(self, pool, slot):
+        self._pool = pool
+        self._slot = slot
+
+    def __getattr__(self, name):
+        if self._slot is None:
+            raise mysql.connector.errors.OperationalError("Connection was returned to the pool")
+        return getattr(self._slot.connection, name)
+
+    def close(self):
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            self._pool.release(slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded MySQL connection pool.
+
+    Connections are opened lazily up to `size`, health-checked with a ping
+    (reconnecting if needed) when they have been idle, and rolled back before
+    reuse. Recurring single-statement queries can run as server-side prepared
+    statements that stay prepared per connection. Time spent waiting for a
+    free connection is recorded for sizing.
+    """
+
+    def __init__(self, size=None, timeout=None, health_check_interval=None, **connect_kwargs):
+        """
+        Args:
+            size (int, optional): Maximum number of open connections.
+            timeout (float, optional): Seconds to wait for a free connection.
+            health_check_interval (float, optional): Idle seconds before a ping.
+            **connect_kwargs: Overrides for mysql.connector.connect().
+        """
+        self.size = size or MYSQL_POOL_SIZE
+        self.timeout = MYSQL_POOL_TIMEOUT if timeout is None else timeout
+        self.health_check_interval = (
+            MYSQL_HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval
+        )
+        self.connect_kwargs = dict(connection_settings(), **connect_kwargs)
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+        self.acquisitions = 0
+        self.reconnects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _open(self):
+        return _Slot(mysql.connector.connect(**self.connect_kwargs))
+
+    def _discard(self, slot):
+        """Closes a broken connection and frees its place so the pool can open a fresh one."""
+        slot.reset_prepared()
+        try:
+            slot.connection.close()
+        except mysql.connector.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _check(self, slot):
+        if time.monotonic() - slot.last_used < self.health_check_interval:
+            return slot
+        try:
+            slot.connection.ping(reconnect=False)
+        except mysql.connector.Error:
+            slot.reset_prepared()
+            try:
+                slot.connection.reconnect(attempts=3, delay=1)
+            except mysql.connector.Error:
+                self._discard(slot)
+                raise
+            self.reconnects += 1
+        return slot
+
+    def acquire(self):
+        """Returns a healthy _Slot, waiting up to `timeout` seconds for one."""
+        started = time.perf_counter()
+        slot = None
+        try:
+            slot = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    slot = self._open()
+                except mysql.connector.Error:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    slot = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolError(f"No MySQL connection available within {self.timeout}s")
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.acquisitions += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return self._check(slot)
+
+    def release(self, slot):
+        try:
+            if slot.connection.unread_result:
+                slot.connection.consume_results()
+            if slot.connection.in_transaction:
+                slot.connection.rollback()
+        except mysql.connector.Error:
+            self._discard(slot)
+            return
+        slot.last_used = time.monotonic()
+        self._idle.put(slot)
+
+    def create_connection(self):
+        """Drop-in replacement for mysql.connector.connect() backed by the pool."""
+        return PooledConnection(self, self.acquire())
+
+    @contextmanager
+    def connection(self):
+        connection = self.create_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def execute_prepared(self, query, params=()):
+        """
+        Runs `query` as a server-side prepared statement and returns all rows.
+        The statement is prepared once per pooled connection and reused.
+        """
+        slot = self.acquire()
+        try:
+            cursor = slot.prepared.get(query)
+            if cursor is None:
+                cursor = slot.connection.cursor(prepared=True)
+                slot.prepared[query] = cursor
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
+        except mysql.connector.Error:
+            slot.reset_prepared()
+            raise
+        finally:
+            self.release(slot)
+
+    def fetch_one_prepared(self, query, params=()):
+        rows = self.execute_prepared(query, params)
+        return rows[0] if rows else None
+
+    async def execute_prepared_async(self, query, params=()):
+        """Async variant of execute_prepared, run on a worker thread."""
+        return await asyncio.to_thread(self.execute_prepared, query, params)
+
+    async def read_sql_async(self, query, params=None):
+        """Async pandas.read_sql over a pooled connection."""
+        import pandas as pd
+
+        def read():
+            with self.connection() as connection:
+                return pd.read_sql(query, connection, params=params)
+
+        return await asyncio.to_thread(read)
+
+    def metrics(self):
+        """Returns pool size, usage and connection wait-time metrics."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'open': self._opened,
+                'idle': self._idle.qsize(),
+                'acquisitions': self.acquisitions,
+                'reconnects': self.reconnects,
+                'avg_wait_seconds': self.total_wait / self.acquisitions if self.acquisitions else 0.0,
+                'max_wait_seconds': self.max_wait,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(size=None, **kwargs):
+    """Replaces the process-wide pool, e.g. with a single connection for the ETL."""
+    global _pool
+    with _pool_lock:
+        _pool = ConnectionPool(size=size, **kwargs)
+    return _pool
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it from the environment on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def create_connection():
+    """
+    Pooled connection; use it as a context manager (or call close() in a
+    finally block) so the slot is handed back even when a query raises.
+    """
+    return get_pool().create_connection()
+
+
+def read_sql_chunked(connection, query, params=None, chunk_rows=None):
+    """
+    Reads a query result into a DataFrame in batches of `chunk_rows` rows.
+
+    mysql.connector cursors are unbuffered by default: rows are read from the
+    socket as fetchmany() asks for them, so only one batch of Python row
+    tuples exists at a time instead of the whole result being converted at
+    once as pandas.read_sql does with fetchall().
+    Args:
+        connection: DB-API connection (pooled or not).
+        query (str): SELECT statement with %s placeholders.
+        params (tuple, optional): Query parameters.
+        chunk_rows (int, optional): Rows per fetchmany() call.
+    Returns:
+        pd.DataFrame: The result, with the cursor's column names.
+    """
+    import pandas as pd
+
+    chunk_rows = chunk_rows or MYSQL_FETCH_ROWS
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params or ())
+        columns = [column[0] for column in cursor.description]
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            chunks.append(pd.DataFrame(rows, columns=columns))
+    finally:
+        # A failure mid-read leaves rows unread, and the connection refuses new queries until they are read
+        if getattr(connection, 'unread_result', False):
+            connection.consume_results()
+        cursor.close()
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,223 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# JSON-lines span log: a file path, "-" for stderr, or empty to disable
+INSTRUMENTATION_LOG = os.getenv("INSTRUMENTATION_LOG", "")
+# Opt-in per-request profiler: "cprofile", "tracemalloc" or empty
+INSTRUMENTATION_PROFILE = os.getenv("INSTRUMENTATION_PROFILE", "").lower()
+# Where cProfile dumps are written (open them with pstats or snakeviz)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Functions / allocation sites included in the logged profile summary
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+
+_log_lock = threading.Lock()
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def peak_rss_bytes():
+    """Returns the process's lifetime peak resident set size, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    """Returns the process's current resident set size, or None where unsupported."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def log_event(event, **fields):
+    """Appends one JSON object to INSTRUMENTATION_LOG."""
+    if not INSTRUMENTATION_LOG:
+        return
+    record = {'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), 'event': event}
+    record.update(fields)
+    line = json.dumps(record, default=str) + "\n"
+    with _log_lock:
+        if INSTRUMENTATION_LOG == "-":
+            sys.stderr.write(line)
+            sys.stderr.flush()
+        else:
+            with open(INSTRUMENTATION_LOG, "a") as f:
+                f.write(line)
+
+
+class Span:
+    """A timed stage. Code inside the span reports what it processed via record()."""
+
+    def __init__(self, name, parent, fields):
+        self.name = name
+        self.parent = parent
+        self.fields = fields
+        self.rows = None
+        self.bytes = None
+        self.duration = None
+
+    def record(self, rows=None, bytes=None, **fields):
+        """Adds rows/bytes processed (accumulating over calls) and extra fields."""
+        if rows is not None:
+            self.rows = (self.rows or 0) + int(rows)
+        if bytes is not None:
+            self.bytes = (self.bytes or 0) + int(bytes)
+        self.fields.update(fields)
+
+    def record_frame(self, df):
+        """Records a DataFrame's row count and in-memory size."""
+        self.record(rows=len(df), bytes=int(df.memory_usage(deep=True).sum()))
+
+
+class StageMetrics:
+    """Per-stage aggregates of every finished span in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, span, failed):
+        with self._lock:
+            stage = self._stages.setdefault(span.name, {
+                'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                'rows': 0, 'bytes': 0, 'last_seconds': None,
+            })
+            stage['count'] += 1
+            stage['errors'] += int(failed)
+            stage['total_seconds'] += span.duration
+            stage['max_seconds'] = max(stage['max_seconds'], span.duration)
+            stage['last_seconds'] = span.duration
+            stage['rows'] += span.rows or 0
+            stage['bytes'] += span.bytes or 0
+
+    def snapshot(self):
+        """Returns the aggregates plus mean duration per stage and the process peak RSS."""
+        with self._lock:
+            stages = {
+                name: dict(stage, mean_seconds=stage['total_seconds'] / stage['count'])
+                for name, stage in self._stages.items()
+            }
+        return {'stages': stages, 'process_peak_rss_bytes': peak_rss_bytes()}
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+
+metrics = StageMetrics()
+
+
+@contextmanager
+def span(name, **fields):
+    """
+    Times the enclosed block as stage `name`, aggregates it into `metrics` and
+    writes it to the JSON log. Nested spans record their parent's name.
+
+    Args:
+        name (str): Stage name, e.g. 'db_fetch' or 'insert'.
+        **fields: Extra attributes logged with the span (table, ticker, ...).
+    """
+    parent = _current_span.get()
+    current = Span(name, parent.name if parent else None, fields)
+    token = _current_span.set(current)
+    failed = False
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        failed = True
+        current.fields['error'] = repr(e)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        metrics.observe(current, failed)
+        # RSS change over the span; the high-water mark is process-wide and only ever grows
+        rss_after = current_rss_bytes()
+        rss_delta = rss_after - rss_before if rss_after is not None and rss_before is not None else None
+        log_event(
+            'span', name=name, parent=current.parent, status='error' if failed else 'ok',
+            duration_seconds=round(current.duration, 6), rows=current.rows, bytes=current.bytes,
+            rss_delta_bytes=rss_delta, process_peak_rss_bytes=peak_rss_bytes(),
+            thread=threading.current_thread().name, **current.fields,
+        )
+
+
+def traced(name, **fields):
+    """Decorator running every call of the function inside span(name)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **fields):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _cprofile_summary(profile):
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    return stream.getvalue()
+
+
+@contextmanager
+def profiled(name, **fields):
+    """
+    A span for one request or job run that is additionally profiled when
+    INSTRUMENTATION_PROFILE is set: "cprofile" dumps a .prof file per run to
+    PROFILE_DIR, "tracemalloc" logs the peak Python allocation and the top
+    allocation sites. Without the setting this is just span(name).
+    """
+    mode = INSTRUMENTATION_PROFILE
+    profile = None
+    if mode == "cprofile":
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler; overlapping requests go unprofiled
+            profile = None
+    elif mode == "tracemalloc":
+        # Left running once started, since concurrent requests may be measuring too
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    try:
+        with span(name, **fields) as current:
+            yield current
+    finally:
+        if profile is not None:
+            profile.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{name}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.prof")
+            profile.dump_stats(path)
+            log_event('profile', name=name, mode=mode, path=path, summary=_cprofile_summary(profile))
+        elif mode == "tracemalloc":
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP_N]
+            log_event(
+                'profile', name=name, mode=mode, peak_traced_bytes=peak,
+                top_allocations=[{'site': str(stat.traceback), 'bytes': stat.size} for stat in top],
+            )
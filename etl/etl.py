@@ -3,23 +3,30 @@ import pandas as pd
 import mysql.connector
 from datetime import datetime, timedelta
 import os
-from io import StringIO
+import json
 import requests
-import base64
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+# MySQL connections come from the shared bounded pool (close() hands them back)
+from db import create_connection, configure_pool, get_pool
+# Timing spans, row/byte counts and opt-in profiling (JSON log via INSTRUMENTATION_LOG)
+from instrumentation import span, profiled, traced, metrics
 
-# MySQL connection setup
-def create_connection():
-    """
-    Establishes a connection to the MySQL database using environment variables.
-    Returns:
-        mysql.connector.connection: MySQL connection object.
-    """
-    return mysql.connector.connect(
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        host=os.getenv("MYSQL_HOST"),
-        database='project'
-    )
+# Bulk-load tuning: rows per multi-row INSERT and rows per transaction
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "1000"))
+ETL_COMMIT_INTERVAL = int(os.getenv("ETL_COMMIT_INTERVAL", "10000"))
+
+# Assets ingested into the long-format prices table; gold also feeds the gold table
+GOLD_TICKER = "GC=F"
+PRICE_TICKERS = [t.strip() for t in os.getenv("PRICE_TICKERS", "GC=F,SI=F,DX-Y.NYB,CL=F").split(",") if t.strip()]
+PRICE_FETCH_WORKERS = int(os.getenv("PRICE_FETCH_WORKERS", "4"))
+PRICE_FETCH_RATE = float(os.getenv("PRICE_FETCH_RATE", "2"))  # requests per second
+PRICE_FETCH_RETRIES = int(os.getenv("PRICE_FETCH_RETRIES", "3"))
+PRICE_FETCH_BACKOFF = float(os.getenv("PRICE_FETCH_BACKOFF", "1.0"))  # seconds, doubled per retry
 
 # Fetch the latest date in the gold table
 def get_latest_date_from_mysql_gold():
@@ -28,11 +35,7 @@ def get_latest_date_from_mysql_gold():
     Returns:
         datetime.date: Latest date in the gold table.
     """
-    connection = create_connection()
-    cursor = connection.cursor()
-    cursor.execute("SELECT MAX(Date) FROM gold")
-    result = cursor.fetchone()
-    connection.close()
+    result = get_pool().fetch_one_prepared("SELECT MAX(Date) FROM gold")
 
     return result[0] if result and result[0] else datetime(2020, 1, 1).date()
 
@@ -43,74 +46,81 @@ def get_latest_event_id_from_mysql_events():
     Returns:
         int: Latest event_id in the events table.
     """
-    connection = create_connection()
-    cursor = connection.cursor()
-    cursor.execute("SELECT MAX(event_id) FROM events")
-    result = cursor.fetchone()
-    connection.close()
+    result = get_pool().fetch_one_prepared("SELECT MAX(event_id) FROM events")
 
     return result[0] if result and result[0] else 0  # Assuming event_id starts at 1
 
 
-# Fetch gold price data starting from the last date in the database
-def fetch_gold_data(start_date):
+# Download daily prices through yfinance
+class YahooPriceSource:
+    def download(self, ticker, start_date, end_date):
+        price_data = yf.download(
+            ticker,
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d'),
+            progress=False,
+            threads=False,
+        )
+        # yf.download catches per-ticker errors and returns an empty frame; treat an
+        # empty window that contains business days as a failure so call_with_retry retries it
+        if price_data.empty and not pd.bdate_range(start=start_date, end=end_date, inclusive='left').empty:
+            raise RuntimeError(f"yfinance returned no rows for {ticker} between {start_date} and {end_date}")
+        return price_data
+
+# Select the price source ("yahoo" or the offline "stub")
+def get_price_source():
+    if os.getenv("PRICE_SOURCE", "yahoo") == "stub":
+        from stubs import StubPriceSource
+        return StubPriceSource()
+    return YahooPriceSource()
+
+# Fetch price data for one ticker starting from the given date
+def fetch_price_data(ticker, start_date, source=None):
     """
-    Fetches gold price data from Yahoo Finance starting from the specified date.
+    Fetches daily prices for `ticker` from `start_date` up to today.
     Args:
-        start_date (datetime.date): Start date for fetching gold data.
+        ticker (str): Yahoo Finance symbol, e.g. 'GC=F'.
+        start_date (datetime.date): Start date for fetching data.
+        source (optional): Price source; defaults to get_price_source().
     Returns:
-        pd.DataFrame: DataFrame containing the fetched gold data.
+        pd.DataFrame: Date, Adj Close, Close, High, Low, Open, Volume columns.
     """
+    source = source or get_price_source()
     end_date = datetime.now().date()
-    gold_data = yf.download('GC=F', start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'))
+    with span("price_download", ticker=ticker) as stage:
+        price_data = source.download(ticker, start_date, end_date)
+        stage.record(rows=len(price_data))
 
-    if gold_data.empty:
-        print("No data fetched from Yahoo Finance.")
-        return gold_data
+    if price_data.empty:
+        print(f"No data fetched for {ticker}.")
+        return price_data
 
-    gold_data.reset_index(inplace=True)
-    gold_data['Date'] = gold_data['Date'].dt.date
+    price_data = price_data.reset_index()
 
-    # Check if columns are multi-indexed and flatten them
-    if isinstance(gold_data.columns, pd.MultiIndex):
-        gold_data.columns = ['_'.join(col).strip() for col in gold_data.columns.values]
-        print("Flattened multi-indexed columns:", gold_data.columns.tolist())
-    else:
-        print("Single-level columns:", gold_data.columns.tolist())
-
-    # Define column mapping including 'Date_'
-    column_mapping = {
-        'Date_': 'Date',  # Rename 'Date_' to 'Date'
-        'Adj Close_GC=F': 'Adj Close',
-        'Close_GC=F': 'Close',
-        'High_GC=F': 'High',
-        'Low_GC=F': 'Low',
-        'Open_GC=F': 'Open',
-        'Volume_GC=F': 'Volume',
-        'Adj Close': 'Adj Close',
-        'Close': 'Close',
-        'High': 'High',
-        'Low': 'Low',
-        'Open': 'Open',
-        'Volume': 'Volume'
-    }
+    # yfinance returns (field, ticker) columns; keep the field names only
+    if isinstance(price_data.columns, pd.MultiIndex):
+        price_data.columns = [col[0] for col in price_data.columns.values]
 
-    # If columns were flattened, adjust the mapping accordingly
-    if isinstance(gold_data.columns, pd.MultiIndex):
-        # Extract the field name by splitting
-        gold_data = gold_data.rename(columns=lambda x: x.split('_')[0] if '_' in x else x)
+    price_data['Date'] = pd.to_datetime(price_data['Date']).dt.date
 
-    # Rename columns using the updated column_mapping
-    gold_data.rename(columns=column_mapping, inplace=True)
-
-    # Verify the columns after renaming
+    # Verify the columns after flattening
     expected_columns = ['Date', 'Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
-    missing_columns = [col for col in expected_columns if col not in gold_data.columns]
+    missing_columns = [col for col in expected_columns if col not in price_data.columns]
     if missing_columns:
-        print(f"Warning: The following expected columns are missing after renaming: {missing_columns}")
+        print(f"Warning: {ticker} is missing the expected columns: {missing_columns}")
 
-    print("Columns after renaming:", gold_data.columns.tolist())
-    return gold_data
+    return price_data
+
+# Fetch gold price data starting from the last date in the database
+def fetch_gold_data(start_date):
+    """
+    Fetches gold price data from Yahoo Finance starting from the specified date.
+    Args:
+        start_date (datetime.date): Start date for fetching gold data.
+    Returns:
+        pd.DataFrame: DataFrame containing the fetched gold data.
+    """
+    return fetch_price_data(GOLD_TICKER, start_date)
 
 # Calculate percentage change for gold prices
 def calculate_change_percentage(gold_data):
@@ -121,136 +131,903 @@ def calculate_change_percentage(gold_data):
         print("Warning: 'Close' column not found in gold data.")
     return gold_data
 
+# Convert DataFrame columns to driver-ready rows, mapping NaN/NaT to NULL
+def dataframe_to_rows(df, columns):
+    """
+    Converts the given columns to a list of Python row lists without iterating
+    row by row in pandas.
+    Args:
+        df (pd.DataFrame): Source data.
+        columns (list): Columns to export, in insert order.
+    Returns:
+        list: Rows with None in place of missing values.
+    """
+    values = df[columns]
+    return values.astype(object).where(values.notna(), None).to_numpy().tolist()
+
+# Insert a DataFrame with chunked multi-row INSERT statements
+def bulk_insert(connection, table, columns, df, batch_size=None, commit_interval=None, suffix=""):
+    """
+    Streams rows into `table` as multi-row INSERTs of `batch_size` rows,
+    committing every `commit_interval` rows.
+    Args:
+        connection (mysql.connector.connection): Open MySQL connection.
+        table (str): Target table.
+        columns (list): Column names, matching the DataFrame columns.
+        df (pd.DataFrame): Rows to insert.
+        batch_size (int, optional): Rows per INSERT statement.
+        commit_interval (int, optional): Rows per transaction.
+        suffix (str, optional): Clause appended to each INSERT.
+    Returns:
+        int: Number of rows sent.
+    """
+    batch_size = batch_size or ETL_BATCH_SIZE
+    commit_interval = commit_interval or ETL_COMMIT_INTERVAL
+    total = len(df)
+    if not total:
+        return 0
+
+    column_list = ", ".join(f"`{col}`" for col in columns)
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    uncommitted = 0
+    try:
+        with span("insert", table=table) as stage:
+            # Convert one batch at a time so only batch_size Python rows exist at once
+            for start in range(0, total, batch_size):
+                batch = dataframe_to_rows(df.iloc[start:start + batch_size], columns)
+                sql = f"INSERT INTO {table} ({column_list}) VALUES " + ", ".join([row_placeholder] * len(batch)) + suffix
+                cursor.execute(sql, [value for row in batch for value in row])
+                uncommitted += len(batch)
+                if uncommitted >= commit_interval:
+                    connection.commit()
+                    uncommitted = 0
+            connection.commit()
+            stage.record(rows=total)
+    except mysql.connector.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else float('inf')
+    print(f"Loaded {total} rows into {table} in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+    return total
+
+# Build an ON DUPLICATE KEY UPDATE clause that overwrites the given columns
+def upsert_suffix(columns):
+    return " ON DUPLICATE KEY UPDATE " + ", ".join(f"`{col}` = VALUES(`{col}`)" for col in columns)
+
+# Add the Date primary key to gold tables created before it existed
+def ensure_gold_primary_key():
+    """
+    Deduplicates the gold table and adds a primary key on Date if it is
+    missing. The deduplicated copy is built in a staging table and swapped in
+    atomically with RENAME TABLE, so readers never see a partial table.
+    Raises mysql.connector.Error if the key cannot be added, so that no load
+    runs against a keyless gold table.
+    """
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.table_constraints
+        WHERE table_schema = DATABASE() AND table_name = 'gold' AND constraint_type = 'PRIMARY KEY'
+        """)
+        if cursor.fetchone()[0]:
+            cursor.close()
+            return
+
+        print("Adding a primary key on gold.Date (deduplicating existing rows).")
+        try:
+            cursor.execute("DROP TABLE IF EXISTS gold_staging")
+            cursor.execute("CREATE TABLE gold_staging LIKE gold")
+            cursor.execute("ALTER TABLE gold_staging MODIFY Date date NOT NULL, ADD PRIMARY KEY (Date)")
+            # Keep the last loaded row for every duplicated day
+            cursor.execute("""
+            INSERT INTO gold_staging SELECT * FROM gold WHERE Date IS NOT NULL
+            ON DUPLICATE KEY UPDATE Price = VALUES(Price), Open = VALUES(Open), High = VALUES(High),
+                Low = VALUES(Low), `Change %` = VALUES(`Change %`), Source = VALUES(Source)
+            """)
+            cursor.execute("RENAME TABLE gold TO gold_old, gold_staging TO gold")
+            cursor.execute("DROP TABLE gold_old")
+            connection.commit()
+        except mysql.connector.Error as err:
+            # Without the key, upserts never match and reruns would insert duplicate days again
+            print(f"Could not add the primary key on gold.Date; stopping the load. MySQL Error: {err}")
+            raise
+        finally:
+            cursor.close()
+
+# Add the events.Date index that the backend's windowed reads range-scan
+def ensure_events_date_index():
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'events' AND index_name = 'idx_events_date'
+        """)
+        if not cursor.fetchone()[0]:
+            print("Adding an index on events.Date.")
+            cursor.execute("CREATE INDEX idx_events_date ON events (Date)")
+            connection.commit()
+        cursor.close()
+
 # Store gold data in MySQL
 def store_gold_data_in_mysql(gold_data):
     if gold_data.empty:
         print("No new data to add to the gold table.")
-        return
+        return 0
 
-    connection = create_connection()
-    cursor = connection.cursor()
-    data_to_insert = []
-    for idx, row in gold_data.iterrows():
-        try:
-            date = row['Date']
-            close = float(row['Close']) if not pd.isna(row['Close']) else None
-            open_price = float(row['Open']) if not pd.isna(row['Open']) else None
-            high = float(row['High']) if not pd.isna(row['High']) else None
-            low = float(row['Low']) if not pd.isna(row['Low']) else None
-            change_pct = float(row['Change %']) if 'Change %' in row and not pd.isna(row['Change %']) else None
-            source = 'Yahoo Finance'
-            data_to_insert.append((date, close, open_price, high, low, change_pct, source))
-        except Exception as e:
-            print(f"Error processing row {row}: {e}")
+    def numeric(column):
+        if column not in gold_data.columns:
+            return pd.Series(None, index=gold_data.index, dtype=float)
+        return pd.to_numeric(gold_data[column], errors='coerce')
 
-    sql = """
-    INSERT INTO gold (Date, Price, Open, High, Low, `Change %`, Source)
-    VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
+    rows = pd.DataFrame({
+        'Date': gold_data['Date'],
+        'Price': numeric('Close'),
+        'Open': numeric('Open'),
+        'High': numeric('High'),
+        'Low': numeric('Low'),
+        'Change %': numeric('Change %'),
+        'Source': 'Yahoo Finance',
+    })
+
+    columns = list(rows.columns)
+    # Upserts on the primary key make reruns and overlapping windows idempotent
+    suffix = upsert_suffix(columns[1:])
+    rows_loaded = 0
+    connection = create_connection()
     try:
-        if data_to_insert:
-            print("Data to insert:", data_to_insert)
-            cursor.executemany(sql, data_to_insert)
-            connection.commit()
-            print("New gold data loaded into MySQL.")
-        else:
-            print("No valid data to insert into the gold table.")
+        rows_loaded = bulk_insert(connection, 'gold', columns, rows, suffix=suffix)
+        print("New gold data loaded into MySQL.")
     except mysql.connector.Error as err:
         print(f"MySQL Error: {err}")
-        # Optionally, print data that failed to insert for debugging
-        for record in data_to_insert:
-            print("Failed record:", record)
     finally:
-        cursor.close()
         connection.close()
+    return rows_loaded
+
+# GitHub contents API root (point at a local stub for offline runs) and local CSV cache
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+EVENTS_CACHE_DIR = os.getenv("EVENTS_CACHE_DIR", "cache")
+EVENTS_CSV_CHUNKSIZE = int(os.getenv("EVENTS_CSV_CHUNKSIZE", "10000"))
+# Connect and per-read timeouts (seconds) for the GitHub request; a timeout fails the run
+EVENTS_FETCH_TIMEOUT = (
+    float(os.getenv("EVENTS_CONNECT_TIMEOUT", "10")),
+    float(os.getenv("EVENTS_READ_TIMEOUT", "60")),
+)
+
+# File-like wrapper that copies everything read from `source` into `sink`
+class TeeReader:
+    def __init__(self, source, sink):
+        self.source = source
+        self.sink = sink
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        if data:
+            self.sink.write(data)
+            self.bytes_read += len(data)
+        return data
+
+# Parse an events CSV in chunks, keeping only rows with event_id > latest_event_id
+def read_new_events(csv_file, latest_event_id):
+    """
+    Args:
+        csv_file (file-like or str): Events CSV stream or path.
+        latest_event_id (int): Latest event_id already stored in MySQL.
+    Returns:
+        tuple: (pd.DataFrame of new events, largest event_id seen in the file)
+    """
+    with span("events_parse") as stage:
+        new_events, max_event_id = _read_new_events(csv_file, latest_event_id)
+        stage.record(rows=len(new_events))
+    return new_events, max_event_id
+
+def _read_new_events(csv_file, latest_event_id):
+    new_chunks = []
+    max_event_id = latest_event_id
+    for chunk in pd.read_csv(csv_file, chunksize=EVENTS_CSV_CHUNKSIZE):
+        # Ensure event_id is of integer type and drop rows without one
+        chunk['event_id'] = pd.to_numeric(chunk['event_id'], errors='coerce')
+        chunk = chunk.dropna(subset=['event_id'])
+        chunk['event_id'] = chunk['event_id'].astype(int)
+        if not chunk.empty:
+            max_event_id = max(max_event_id, int(chunk['event_id'].max()))
+        new_chunks.append(chunk[chunk['event_id'] > latest_event_id])
+    if not new_chunks:
+        return pd.DataFrame(), max_event_id
+    return pd.concat(new_chunks, ignore_index=True), max_event_id
 
 # Fetch the events CSV file from GitHub
-def fetch_csv_from_github():
-    url = f"https://api.github.com/repos/{os.getenv('REPO_OWNER')}/{os.getenv('REPO_NAME')}/contents/{os.getenv('FILE_PATH')}"
-    headers = {"Authorization": f"token {os.getenv('GITHUB_TOKEN')}"}
-    response = requests.get(url, headers=headers)
+def fetch_csv_from_github(latest_event_id=0):
+    """
+    Fetches events with event_id > latest_event_id from the GitHub CSV.
+    The request carries the cached ETag, so an unchanged file costs a 304 and
+    is served from the local copy (or skipped entirely when it holds nothing
+    new). A changed file is streamed to the cache while it is parsed.
+    Args:
+        latest_event_id (int): Latest event_id already stored in MySQL.
+    Returns:
+        pd.DataFrame: New events rows.
+    """
+    url = f"{GITHUB_API_URL}/repos/{os.getenv('REPO_OWNER')}/{os.getenv('REPO_NAME')}/contents/{os.getenv('FILE_PATH')}"
+    cache_path = os.path.join(EVENTS_CACHE_DIR, "events.csv")
+    meta_path = os.path.join(EVENTS_CACHE_DIR, "events.json")
+    meta = {}
+    if os.path.exists(meta_path) and os.path.exists(cache_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    # Raw media type returns the file body itself instead of base64 JSON
+    headers = {"Accept": "application/vnd.github.raw"}
+    if os.getenv('GITHUB_TOKEN'):
+        headers["Authorization"] = f"token {os.getenv('GITHUB_TOKEN')}"
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+
+    with span("github_fetch") as stage:
+        new_events = _fetch_events_response(url, headers, meta, cache_path, meta_path, latest_event_id, stage)
+        stage.record(rows=len(new_events))
+    return new_events
+
+# Handle the (conditional) GitHub response for fetch_csv_from_github
+def _fetch_events_response(url, headers, meta, cache_path, meta_path, latest_event_id, stage):
+    response = requests.get(url, headers=headers, stream=True, timeout=EVENTS_FETCH_TIMEOUT)
+    stage.record(status_code=response.status_code)
+
+    if response.status_code == 304:
+        response.close()
+        if meta.get("max_event_id", 0) <= latest_event_id:
+            print("Events CSV unchanged (304) and fully loaded.")
+            return pd.DataFrame()
+        print("Events CSV unchanged (304); reading new rows from the local cache.")
+        new_events, _ = read_new_events(cache_path, latest_event_id)
+        return new_events
 
     if response.status_code == 200:
-        # GitHub API returns the file content in base64
-        content = response.json().get("content")
-        csv_content = StringIO(base64.b64decode(content).decode("utf-8"))
-        return pd.read_csv(csv_content)
+        os.makedirs(EVENTS_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        response.raw.decode_content = True
+        with response, open(tmp_path, "wb") as sink:
+            reader = TeeReader(response.raw, sink)
+            new_events, max_event_id = read_new_events(reader, latest_event_id)
+        stage.record(bytes=reader.bytes_read)
+        os.replace(tmp_path, cache_path)
+        with open(meta_path, "w") as f:
+            json.dump({"etag": response.headers.get("ETag"), "max_event_id": max_event_id}, f)
+        return new_events
     else:
         print(f"Failed to fetch the file from GitHub: {response.status_code}")
+        response.close()
         return pd.DataFrame()
 
 # Store new data in MySQL
 def store_events_data_in_mysql(events_data):
     if events_data.empty:
         print("No new data to add.")
-        return
+        return 0
+
+    # CSV headers mapped to the events table columns
+    rows = events_data.rename(columns={
+        'Name of Incident': 'Name_of_Incident',
+        'Type of Event': 'Type_Of_Event',
+    })
+    columns = ['event_id', 'Name_of_Incident', 'Date', 'Country', 'Type_Of_Event', 'Outcome']
+    # Upserts on the primary key make reruns and overlapping windows idempotent
+    suffix = upsert_suffix(columns[1:])
 
+    rows_loaded = 0
     connection = create_connection()
-    cursor = connection.cursor()
+    try:
+        rows_loaded = bulk_insert(connection, 'events', columns, rows, suffix=suffix)
+        print("New events data loaded into MySQL.")
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+    finally:
+        connection.close()
+    return rows_loaded
+
+# Number of preceding trading days a feature row depends on (7-day rolling window)
+FEATURE_CONTEXT_ROWS = 6
 
-    # Prepare data for insertion
-    data_to_insert = []
-    for _, row in events_data.iterrows():
-        data_tuple = (
-            row['event_id'],
-            row['Name of Incident'],
-            row['Date'],
-            row['Country'],
-            row['Type of Event'],
-            row['Outcome']
+# Create the materialized feature table if the database predates it
+def ensure_gold_features_table():
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gold_features (
+            Date date NOT NULL,
+            Price double DEFAULT NULL,
+            `Change %` double DEFAULT NULL,
+            Price_Lag1 double DEFAULT NULL,
+            Price_Lag2 double DEFAULT NULL,
+            `7d_avg_price` double DEFAULT NULL,
+            `7d_avg_change` double DEFAULT NULL,
+            PRIMARY KEY (Date)
         )
-        data_to_insert.append(data_tuple)
+        """)
+        connection.commit()
+        cursor.close()
 
-    # Define the SQL statement
-    sql = """
-    INSERT INTO events (event_id, Name_of_Incident, Date, Country, Type_Of_Event, Outcome)
-    VALUES (%s, %s, %s, %s, %s, %s)
+# Compute lag and rolling-window features for a date-ordered price window
+def compute_gold_features(prices):
     """
+    Computes the model features for consecutive gold rows.
+    Args:
+        prices (pd.DataFrame): Date, Price and Change % ordered by Date.
+    Returns:
+        pd.DataFrame: Input columns plus lag and 7-day rolling features.
+    """
+    features = prices.copy()
+    features['Price_Lag1'] = features['Price'].shift(1)
+    features['Price_Lag2'] = features['Price'].shift(2)
+    features['7d_avg_price'] = features['Price'].rolling(window=7).mean()
+    features['7d_avg_change'] = features['Change %'].rolling(window=7).mean()
+    return features.fillna(0)
 
-    try:
-        cursor.executemany(sql, data_to_insert)
+# Extend the materialized feature table with rows for newly loaded gold dates
+@traced("feature_refresh")
+def refresh_gold_features(since=None):
+    """
+    Recomputes feature rows from `since` (or the day after the latest
+    materialized date) onwards. Only the FEATURE_CONTEXT_ROWS gold rows before
+    that point are read as context, so the cost depends on the new rows only.
+    Args:
+        since (datetime.date, optional): Earliest gold date that changed.
+    """
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT MAX(Date) FROM gold_features")
+        result = cursor.fetchone()
+        latest_feature_date = result[0] if result else None
+
+        if latest_feature_date is not None:
+            start = latest_feature_date + timedelta(days=1)
+            if since is not None:
+                start = min(start, since)
+            cursor.execute(
+                "SELECT Date, Price, `Change %` FROM gold WHERE Date < %s ORDER BY Date DESC LIMIT %s",
+                (start, FEATURE_CONTEXT_ROWS)
+            )
+            context_rows = cursor.fetchall()[::-1]
+            cursor.execute(
+                "SELECT Date, Price, `Change %` FROM gold WHERE Date >= %s ORDER BY Date", (start,)
+            )
+        else:
+            # Empty feature table: build it from the whole history once
+            start = None
+            context_rows = []
+            cursor.execute("SELECT Date, Price, `Change %` FROM gold ORDER BY Date")
+        new_rows = cursor.fetchall()
+
+        if not new_rows:
+            print("Gold features are up to date.")
+            cursor.close()
+            return
+
+        prices = pd.DataFrame(context_rows + new_rows, columns=['Date', 'Price', 'Change %'])
+        prices = prices.drop_duplicates(subset='Date', keep='last').reset_index(drop=True)
+        with span("feature_prep") as stage:
+            features = compute_gold_features(prices)
+            stage.record_frame(features)
+        if start is not None:
+            features = features[features['Date'] >= start]
+
+        columns = ['Date', 'Price', 'Change %', 'Price_Lag1', 'Price_Lag2', '7d_avg_price', '7d_avg_change']
+        cursor.close()
+        try:
+            bulk_insert(connection, 'gold_features', columns, features, suffix=upsert_suffix(columns[1:]))
+            print(f"Materialized {len(features)} gold feature rows.")
+        except mysql.connector.Error as err:
+            print(f"MySQL Error: {err}")
+
+# Create the event-impact summary tables if the database predates them
+def ensure_event_summary_tables():
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_impact_summary (
+            Dimension varchar(20) NOT NULL,
+            Group_Value varchar(100) NOT NULL,
+            Row_Count bigint NOT NULL DEFAULT 0,
+            Change_Count bigint NOT NULL DEFAULT 0,
+            Change_Sum double NOT NULL DEFAULT 0,
+            Change_Sum_Sq double NOT NULL DEFAULT 0,
+            PRIMARY KEY (Dimension, Group_Value)
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_summary_state (
+            Id tinyint NOT NULL,
+            Gold_Date date DEFAULT NULL,
+            Event_Id int DEFAULT NULL,
+            PRIMARY KEY (Id)
+        )
+        """)
         connection.commit()
-        print("New events data loaded into MySQL.")
+        cursor.close()
+
+# Aggregate running count/sum/sum-of-squares of Change % per group
+def summarize_changes(changes, dimension, groups, sign=1):
+    """
+    Args:
+        changes (pd.Series): Change % values (NaN allowed).
+        dimension (str): Summary dimension name.
+        groups (pd.Series or str): Group of every value, or one group for all.
+        sign (int): -1 to remove the values from the running totals.
+    Returns:
+        pd.DataFrame: One delta row per (Dimension, Group_Value).
+    """
+    frame = pd.DataFrame({'Change': changes.astype(float)})
+    frame['Group_Value'] = groups
+    frame['Group_Value'] = frame['Group_Value'].fillna('Unknown')
+    frame['Change_Sq'] = frame['Change'] ** 2
+    summary = frame.groupby('Group_Value').agg(
+        Row_Count=('Change', 'size'),
+        Change_Count=('Change', 'count'),
+        Change_Sum=('Change', 'sum'),
+        Change_Sum_Sq=('Change_Sq', 'sum'),
+    ).reset_index()
+    summary[['Row_Count', 'Change_Count', 'Change_Sum', 'Change_Sum_Sq']] *= sign
+    summary.insert(0, 'Dimension', dimension)
+    return summary
+
+# Fold rows loaded since the last summary refresh into the event-impact summaries
+@traced("summary_refresh")
+def refresh_event_summaries():
+    """
+    Maintains event_impact_summary, the incremental counterpart of the
+    event_impact_by_type, price_change_by_outcome and
+    price_change_event_vs_non_event views. Only gold days and events past the
+    watermark stored in event_summary_state are read, so the cost is
+    proportional to the newly loaded rows.
+    """
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT Gold_Date, Event_Id FROM event_summary_state WHERE Id = 1")
+        state = cursor.fetchone()
+        old_gold_date = state[0] if state and state[0] else datetime(1000, 1, 1).date()
+        old_event_id = state[1] if state and state[1] else 0
+
+        cursor.execute("SELECT MAX(Date) FROM gold")
+        new_gold_date = cursor.fetchone()[0] or old_gold_date
+        cursor.execute("SELECT MAX(event_id) FROM events")
+        new_event_id = cursor.fetchone()[0] or old_event_id
+        if new_gold_date == old_gold_date and new_event_id == old_event_id:
+            print("Event summaries are up to date.")
+            cursor.close()
+            return
+
+        window = {'g0': old_gold_date, 'g1': new_gold_date, 'e0': old_event_id, 'e1': new_event_id}
+
+        # Joined (gold day, event) pairs that did not exist at the previous watermark
+        cursor.execute("""
+        SELECT g.`Change %`, e.Type_of_Event, e.Outcome
+        FROM gold g JOIN events e ON g.Date = e.Date
+        WHERE (g.Date > %(g0)s AND g.Date <= %(g1)s AND e.event_id <= %(e1)s)
+           OR (g.Date <= %(g0)s AND e.event_id > %(e0)s AND e.event_id <= %(e1)s)
+        """, window)
+        pairs = pd.DataFrame(cursor.fetchall(), columns=['Change', 'Type_of_Event', 'Outcome'])
+
+        # New gold days without any event
+        cursor.execute("""
+        SELECT g.`Change %` FROM gold g
+        WHERE g.Date > %(g0)s AND g.Date <= %(g1)s
+          AND NOT EXISTS (SELECT 1 FROM events e WHERE e.Date = g.Date AND e.event_id <= %(e1)s)
+        """, window)
+        new_quiet_days = pd.DataFrame(cursor.fetchall(), columns=['Change'])
+
+        # Previously quiet gold days that received their first event
+        cursor.execute("""
+        SELECT g.`Change %` FROM gold g
+        WHERE g.Date <= %(g0)s
+          AND EXISTS (SELECT 1 FROM events e WHERE e.Date = g.Date AND e.event_id > %(e0)s AND e.event_id <= %(e1)s)
+          AND NOT EXISTS (SELECT 1 FROM events e WHERE e.Date = g.Date AND e.event_id <= %(e0)s)
+        """, window)
+        former_quiet_days = pd.DataFrame(cursor.fetchall(), columns=['Change'])
+        cursor.close()
+
+        deltas = pd.concat([
+            summarize_changes(pairs['Change'], 'Type_of_Event', pairs['Type_of_Event']),
+            summarize_changes(pairs['Change'], 'Outcome', pairs['Outcome']),
+            summarize_changes(pairs['Change'], 'Day_Type', 'Event Day'),
+            summarize_changes(new_quiet_days['Change'], 'Day_Type', 'Non-Event Day'),
+            summarize_changes(former_quiet_days['Change'], 'Day_Type', 'Non-Event Day', sign=-1),
+        ], ignore_index=True)
+
+        columns = ['Dimension', 'Group_Value', 'Row_Count', 'Change_Count', 'Change_Sum', 'Change_Sum_Sq']
+        suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"`{col}` = `{col}` + VALUES(`{col}`)" for col in columns[2:]
+        )
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""
+            INSERT INTO event_summary_state (Id, Gold_Date, Event_Id) VALUES (1, %s, %s)
+            ON DUPLICATE KEY UPDATE Gold_Date = VALUES(Gold_Date), Event_Id = VALUES(Event_Id)
+            """, (new_gold_date, new_event_id))
+            cursor.close()
+            # The watermark is committed in the same transaction as the summary deltas
+            bulk_insert(connection, 'event_impact_summary', columns, deltas,
+                        commit_interval=len(deltas) + 1, suffix=suffix)
+            connection.commit()
+            print(f"Event summaries refreshed up to {new_gold_date} / event {new_event_id}.")
+        except mysql.connector.Error as err:
+            connection.rollback()
+            print(f"MySQL Error: {err}")
+
+# Recompute the event-impact summaries from scratch. Scheduled loads only add days and
+# events past the watermarks; run "python etl.py rebuild-summaries" after reloading or
+# editing existing gold days or events by hand
+def rebuild_event_summaries():
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM event_impact_summary")
+        cursor.execute("DELETE FROM event_summary_state")
+        connection.commit()
+        cursor.close()
+    refresh_event_summaries()
+
+# Spread requests to the price source over time across worker threads
+class RateLimiter:
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): Maximum calls per second (0 disables limiting).
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# Call fn, retrying with exponential backoff and jitter on failure
+def call_with_retry(fn, retries=None, backoff=None, rate_limiter=None):
+    retries = PRICE_FETCH_RETRIES if retries is None else retries
+    backoff = PRICE_FETCH_BACKOFF if backoff is None else backoff
+    for attempt in range(retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.wait()
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            print(f"Attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+# Create the long-format prices table if the database predates it
+def ensure_prices_table():
+    with create_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS prices (
+            Ticker varchar(20) NOT NULL,
+            Date date NOT NULL,
+            Open double DEFAULT NULL,
+            High double DEFAULT NULL,
+            Low double DEFAULT NULL,
+            Close double DEFAULT NULL,
+            Volume double DEFAULT NULL,
+            `Change %` double DEFAULT NULL,
+            PRIMARY KEY (Ticker, Date)
+        )
+        """)
+        connection.commit()
+        cursor.close()
+
+# Fetch the latest stored date per ticker in the prices table
+def get_latest_dates_from_mysql_prices():
+    return dict(get_pool().execute_prepared("SELECT Ticker, MAX(Date) FROM prices GROUP BY Ticker"))
+
+# Store price data for one ticker in the long-format prices table
+def store_prices_in_mysql(ticker, price_data):
+    if price_data.empty:
+        print(f"No new data to add to the prices table for {ticker}.")
+        return 0
+
+    def numeric(column):
+        if column not in price_data.columns:
+            return pd.Series(None, index=price_data.index, dtype=float)
+        return pd.to_numeric(price_data[column], errors='coerce')
+
+    rows = pd.DataFrame({
+        'Ticker': ticker,
+        'Date': price_data['Date'],
+        'Open': numeric('Open'),
+        'High': numeric('High'),
+        'Low': numeric('Low'),
+        'Close': numeric('Close'),
+        'Volume': numeric('Volume'),
+        'Change %': numeric('Change %'),
+    })
+    columns = list(rows.columns)
+    rows_loaded = 0
+    connection = create_connection()
+    try:
+        rows_loaded = bulk_insert(connection, 'prices', columns, rows, suffix=upsert_suffix(columns[2:]))
     except mysql.connector.Error as err:
-        print(f"Error: {err}")
+        print(f"MySQL Error: {err}")
     finally:
-        cursor.close()
         connection.close()
+    return rows_loaded
 
-# Main ETL process
-if __name__ == "__main__":
-    # Gold Data ETL
+# Fetch all tickers concurrently, plus an optional extra task such as the events download
+def fetch_prices_concurrently(start_dates, source=None, extra_task=None):
+    """
+    Downloads every ticker through a thread pool with rate limiting and
+    retry/backoff, so wall-clock time tracks the slowest download rather than
+    the sum of all of them.
+    Args:
+        start_dates (dict): Ticker -> first date to fetch.
+        source (optional): Price source shared by all workers.
+        extra_task (callable, optional): Run in parallel with the downloads.
+    Returns:
+        tuple: (dict of ticker -> DataFrame, result of extra_task or None)
+    """
+    source = source or get_price_source()
+    rate_limiter = RateLimiter(PRICE_FETCH_RATE)
+    results = {}
+    extra_result = None
+
+    with ThreadPoolExecutor(max_workers=PRICE_FETCH_WORKERS + (1 if extra_task else 0)) as pool:
+        extra_future = pool.submit(extra_task) if extra_task else None
+        futures = {
+            ticker: pool.submit(
+                call_with_retry,
+                lambda ticker=ticker, start=start: fetch_price_data(ticker, start, source),
+                rate_limiter=rate_limiter,
+            )
+            for ticker, start in start_dates.items()
+        }
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                print(f"Giving up on {ticker}: {e}")
+                results[ticker] = pd.DataFrame()
+        if extra_future is not None:
+            extra_result = extra_future.result()
+
+    return results, extra_result
+
+# Price start dates: every ticker refetches its last stored day, so the first
+# Change % of the new window is computed against it (calculate_change_percentage
+# then drops that already-stored row)
+def get_price_start_dates():
     latest_gold_date = get_latest_date_from_mysql_gold()
     print(f"Latest gold date in DB: {latest_gold_date}")
-    start_date = latest_gold_date + timedelta(days=1)
-    gold_data = fetch_gold_data(start_date)
+    latest_price_dates = get_latest_dates_from_mysql_prices()
+    start_dates = {GOLD_TICKER: latest_gold_date}
+    for ticker in PRICE_TICKERS:
+        if ticker != GOLD_TICKER:
+            start_dates[ticker] = latest_price_dates.get(ticker, datetime(2020, 1, 1).date())
+    return start_dates
+
+# Load downloaded prices into the gold, prices and gold_features tables
+def load_prices(price_data):
+    """
+    Args:
+        price_data (dict): Ticker -> DataFrame from fetch_prices_concurrently.
+    Returns:
+        dict: Rows loaded per table.
+    """
+    rows = {'gold': 0, 'prices': 0}
+
+    # Gold Data ETL
+    gold_data = price_data.pop(GOLD_TICKER, pd.DataFrame())
     if not gold_data.empty:
-        print("Fetched gold data:")
-        print(gold_data.head())
-        gold_data = calculate_change_percentage(gold_data)
-        print("Gold data after calculating change percentage:")
-        print(gold_data.head())
-        store_gold_data_in_mysql(gold_data)
+        with span("gold_transform") as stage:
+            gold_data = calculate_change_percentage(gold_data)
+            stage.record_frame(gold_data)
+        if not gold_data.empty:
+            print(f"Fetched {len(gold_data)} new gold rows ({gold_data['Date'].min()} to {gold_data['Date'].max()}).")
+        rows['gold'] += store_gold_data_in_mysql(gold_data)
+        if GOLD_TICKER in PRICE_TICKERS:
+            rows['prices'] += store_prices_in_mysql(GOLD_TICKER, gold_data)
     else:
         print("No new gold data fetched.")
 
-    # Events Data ETL
+    # Other assets into the long-format prices table
+    for ticker, data in price_data.items():
+        if not data.empty:
+            rows['prices'] += store_prices_in_mysql(ticker, calculate_change_percentage(data))
+
+    # Feature store refresh (also builds the table on first run)
+    refresh_gold_features(since=gold_data['Date'].min() if not gold_data.empty else None)
+    return rows
+
+# Load new events (already filtered to event_id > latest_event_id while streaming)
+def load_events(events_data):
+    if events_data.empty:
+        print("No new events data fetched.")
+        return {'events': 0}
+    print(f"New events data to insert: {events_data.shape[0]} records")
+    return {'events': store_events_data_in_mysql(events_data)}
+
+# Create tables that databases initialized from an older init.sql may lack
+def ensure_schema():
+    ensure_gold_primary_key()
+    ensure_events_date_index()
+    ensure_prices_table()
+    ensure_gold_features_table()
+    ensure_event_summary_tables()
+
+# Read the watermarks that identify what a run has loaded
+def get_watermarks():
+    return {
+        'gold_date': str(get_latest_date_from_mysql_gold()),
+        'event_id': get_latest_event_id_from_mysql_events(),
+    }
+
+# Scheduled job: refresh all price series
+def run_prices_job():
+    rows = load_prices(fetch_prices_concurrently(get_price_start_dates())[0])
+    refresh_event_summaries()
+    return rows
+
+# Scheduled job: poll the events CSV
+def run_events_job():
     latest_event_id = get_latest_event_id_from_mysql_events()
     print(f"Latest event_id in DB: {latest_event_id}")
-    events_data = fetch_csv_from_github()
-    if not events_data.empty:
-        print("Fetched events data:")
-        print(events_data.tail())
-        # Ensure event_id is of integer type
-        events_data['event_id'] = pd.to_numeric(events_data['event_id'], errors='coerce')
-        # Drop rows with NaN event_id
-        events_data = events_data.dropna(subset=['event_id'])
-        # Convert event_id to integer
-        events_data['event_id'] = events_data['event_id'].astype(int)
-        # Select new events where event_id > latest_event_id
-        new_events_data = events_data[events_data['event_id'] > latest_event_id]
-        print(f"New events data to insert: {new_events_data.shape[0]} records")
-        store_events_data_in_mysql(new_events_data)
-    else:
-        print("No new events data fetched.")
+    rows = load_events(fetch_csv_from_github(latest_event_id))
+    refresh_event_summaries()
+    return rows
+
+# Main ETL process (one-shot): prices and events are downloaded concurrently
+def run_etl():
+    ensure_schema()
+    start_dates = get_price_start_dates()
+    latest_event_id = get_latest_event_id_from_mysql_events()
+    print(f"Latest event_id in DB: {latest_event_id}")
+
+    price_data, events_data = fetch_prices_concurrently(
+        start_dates, extra_task=lambda: fetch_csv_from_github(latest_event_id)
+    )
+    rows = load_prices(price_data)
+    rows.update(load_events(events_data))
+
+    # Event-impact summaries for the dashboard
+    refresh_event_summaries()
+    return rows
+
+# Schedule settings for serve mode
+PRICE_RUN_TIME = os.getenv("PRICE_RUN_TIME", "22:00")  # UTC, after the COMEX close
+EVENTS_POLL_SECONDS = int(os.getenv("EVENTS_POLL_SECONDS", "900"))
+ETL_STATUS_PATH = os.getenv("ETL_STATUS_PATH", os.path.join(EVENTS_CACHE_DIR, "etl_status.json"))
+ETL_STATUS_PORT = int(os.getenv("ETL_STATUS_PORT", "0"))
+
+# Next weekday at the market-close run time (UTC)
+def next_market_close(now):
+    hour, minute = (int(part) for part in PRICE_RUN_TIME.split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+# In-process scheduler for the long-running ETL service
+class EtlScheduler:
+    """
+    Runs the price and event jobs on their own cadences from a single
+    thread, so a job never starts while another run is still in flight.
+    Per-job timings, row counts and watermarks are kept in `status`, written
+    to ETL_STATUS_PATH after every run and optionally served as JSON over HTTP.
+    """
+
+    def __init__(self, jobs):
+        """
+        Args:
+            jobs (dict): Job name -> (callable, next_run(now) -> datetime).
+        """
+        self.jobs = jobs
+        self._run_lock = threading.Lock()
+        now = datetime.utcnow()
+        # Every job runs once at startup
+        self.next_runs = {name: now for name in jobs}
+        self.status = {
+            name: {'runs': 0, 'failures': 0, 'skipped': 0, 'last_run': None}
+            for name in jobs
+        }
 
+    def run_job(self, name):
+        """Runs one job now unless another run is still in flight."""
+        if not self._run_lock.acquire(blocking=False):
+            self.status[name]['skipped'] += 1
+            print(f"Skipping {name}: a run is still in flight.")
+            return
+        job_status = self.status[name]
+        started = time.perf_counter()
+        run = {'started': datetime.utcnow().isoformat(), 'watermarks_before': None}
+        try:
+            run['watermarks_before'] = get_watermarks()
+            with profiled(f"{name}_job"):
+                run['rows'] = self.jobs[name][0]()
+            run['watermarks_after'] = get_watermarks()
+            job_status['runs'] += 1
+        except Exception as e:
+            run['error'] = repr(e)
+            job_status['failures'] += 1
+            print(f"{name} run failed: {e}")
+        finally:
+            run['duration_seconds'] = round(time.perf_counter() - started, 3)
+            job_status['last_run'] = run
+            self._run_lock.release()
+            self.write_status()
+
+    def write_status(self):
+        status = self.snapshot()
+        os.makedirs(os.path.dirname(ETL_STATUS_PATH) or ".", exist_ok=True)
+        tmp_path = ETL_STATUS_PATH + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(status, f, indent=2, default=str)
+        os.replace(tmp_path, ETL_STATUS_PATH)
+
+    def snapshot(self):
+        return {
+            name: dict(self.status[name], next_run=self.next_runs[name].isoformat())
+            for name in self.jobs
+        }
+
+    def serve_status(self, port):
+        scheduler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # /metrics: per-stage timings, rows and bytes; anything else: job status
+                payload = metrics.snapshot() if self.path.rstrip("/") == "/metrics" else scheduler.snapshot()
+                body = json.dumps(payload, default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"ETL status available on port {port}.")
+
+    def run_forever(self):
+        while True:
+            name = min(self.next_runs, key=self.next_runs.get)
+            delay = (self.next_runs[name] - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                time.sleep(delay)
+            self.run_job(name)
+            self.next_runs[name] = self.jobs[name][1](datetime.utcnow())
+
+# Long-running ETL service: one pooled connection and an in-process schedule
+def serve():
+    configure_pool(size=1)
+    ensure_schema()
+    scheduler = EtlScheduler({
+        'prices': (run_prices_job, next_market_close),
+        'events': (run_events_job, lambda now: now + timedelta(seconds=EVENTS_POLL_SECONDS)),
+    })
+    if ETL_STATUS_PORT:
+        scheduler.serve_status(ETL_STATUS_PORT)
+    scheduler.run_forever()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve()
+    elif len(sys.argv) > 1 and sys.argv[1] == "rebuild-summaries":
+        ensure_schema()
+        rebuild_event_summaries()
+    else:
+        with profiled("etl_run"):
+            run_etl()
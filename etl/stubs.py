@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+# Offline stand-in for YahooPriceSource (select with PRICE_SOURCE=stub)
+class StubPriceSource:
+    """
+    Generates deterministic daily prices for any ticker so the ETL can run
+    without network access. The same (ticker, date) always yields the same
+    row, so overlapping fetches agree with each other.
+    """
+
+    def __init__(self, latency=None, base_price=100.0):
+        """
+        Args:
+            latency (float, optional): Seconds to sleep per download, to emulate
+                network time. Defaults to STUB_PRICE_LATENCY or 0.
+            base_price (float): Price level on 2000-01-01.
+        """
+        if latency is None:
+            latency = float(os.getenv("STUB_PRICE_LATENCY", "0"))
+        self.latency = latency
+        self.base_price = base_price
+        self.calls = 0
+
+    def download(self, ticker, start_date, end_date):
+        """
+        Returns business-day prices in [start_date, end_date) shaped like a
+        single-ticker yfinance download.
+        """
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        dates = pd.bdate_range(start=start_date, end=end_date, inclusive='left', name='Date')
+        if dates.empty:
+            return pd.DataFrame(columns=['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume'])
+
+        # Seed per (ticker, day) so any window reproduces the same values
+        seed = zlib.crc32(ticker.encode())
+        day_numbers = (dates - pd.Timestamp('2000-01-01')).days.to_numpy()
+        phase = (seed % 1000) / 1000.0
+        close = self.base_price * (1 + 0.5 * np.sin(day_numbers / 365.0 + phase)) + day_numbers * 0.01
+        spread = 0.01 * close * (1 + np.cos(day_numbers * 0.7 + phase)) / 2
+
+        return pd.DataFrame({
+            'Adj Close': close,
+            'Close': close,
+            'High': close + spread,
+            'Low': close - spread,
+            'Open': close - spread / 2,
+            'Volume': (1000 + (day_numbers * (seed % 97)) % 5000).astype(float),
+        }, index=dates)
+
+
+# Local stand-in for the GitHub contents API (set GITHUB_API_URL to its url)
+class StubGitHubServer:
+    """
+    Serves one file for any /repos/.../contents/... path with a content-hash
+    ETag and honours If-None-Match, so conditional fetches can be tested
+    offline. Call set_content() to simulate a new commit.
+    """
+
+    def __init__(self, content=b"", port=0):
+        """
+        Args:
+            content (bytes): File body to serve.
+            port (int): Port to bind on 127.0.0.1 (0 picks a free one).
+        """
+        self.content = content
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.headers.get("If-None-Match"))
+                if "/contents/" not in self.path:
+                    self.send_error(404)
+                    return
+                etag = stub.etag
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(stub.content)))
+                self.end_headers()
+                self.wfile.write(stub.content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def etag(self):
+        return '"' + hashlib.sha1(self.content).hexdigest() + '"'
+
+    def set_content(self, content):
+        self.content = content
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()